@@ -9,11 +9,16 @@ from typing import Optional, List, Dict
 from datetime import datetime
 from loguru import logger
 
-from services.copilot_service import CopilotService
+from config import settings
+from services.copilot_service import copilot_service
 from services.compliance_checker import ComplianceChecker
+from services.websocket_manager import websocket_manager
 
 router = APIRouter()
 
+# Stateless wrapper around the shared compliance engine
+compliance_checker = ComplianceChecker()
+
 
 class StartCopilotRequest(BaseModel):
     """Request to start a live copilot session"""
@@ -38,6 +43,7 @@ class CopilotSessionResponse(BaseModel):
 class ComplianceNudge(BaseModel):
     """Real-time compliance nudge"""
     nudge_id: str
+    rule_id: Optional[str] = None
     timestamp: float
     severity: str  # "info", "warning", "critical"
     icon: str  # "💡", "⚠️", "🛑"
@@ -61,8 +67,16 @@ async def start_copilot_session(request: StartCopilotRequest):
     Start a new live copilot session
     Returns WebSocket URL for real-time communication
     """
+    # Admission control: refuse new sessions over capacity instead of slowing live calls
+    if websocket_manager.session_load() >= settings.MAX_CONCURRENT_SESSIONS:
+        logger.warning("Refusing copilot session: at MAX_CONCURRENT_SESSIONS")
+        raise HTTPException(
+            status_code=503,
+            detail="Server at capacity, please retry shortly",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+    
     try:
-        copilot_service = CopilotService()
         session = await copilot_service.create_session(
             user_id=request.user_id,
             rep_name=request.rep_name,
@@ -85,7 +99,6 @@ async def get_copilot_session(session_id: str):
     """
     Get copilot session details
     """
-    copilot_service = CopilotService()
     session = await copilot_service.get_session(session_id)
     
     if not session:
@@ -99,12 +112,14 @@ async def stop_copilot_session(session_id: str):
     """
     Stop a copilot session and trigger analytics generation
     """
-    copilot_service = CopilotService()
     result = await copilot_service.stop_session(session_id)
     
     if not result:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    # Close the live socket, whichever worker holds it
+    await websocket_manager.close_session(session_id)
+    
     return {
         "message": "Session stopped",
         "session_id": session_id,
@@ -122,18 +137,19 @@ async def process_transcript(
     Returns any compliance nudges that should be displayed
     """
     try:
-        compliance_checker = ComplianceChecker()
-        
         # Check for compliance issues
-        nudges = await compliance_checker.check_transcript(
+        violations = await compliance_checker.find_violations(
             session_id=session_id,
             speaker=segment.speaker,
             text=segment.text,
-            timestamp=segment.timestamp,
         )
+        nudges = compliance_checker.to_nudges(session_id, segment.timestamp, violations)
         
-        if nudges:
+        if violations:
             logger.warning(f"Compliance issues detected in session {session_id}")
+            # Push to the live widget, whichever worker holds its socket, with
+            # the same recording, suppression and ranking as streamed transcripts
+            await websocket_manager.publish_violations(session_id, violations, segment.timestamp)
         
         return {
             "nudges": [ComplianceNudge(**n) for n in nudges],
@@ -145,12 +161,49 @@ async def process_transcript(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/sessions/{session_id}/process-transcripts")
+async def process_transcripts(
+    session_id: str,
+    segments: List[TranscriptSegment]
+):
+    """
+    Process a batch of transcript segments in one request
+    Returns the compliance nudges for every segment in the batch
+    """
+    try:
+        # Check all segments with a single engine call
+        results = await compliance_checker.find_batch_violations(
+            session_id=session_id,
+            segments=[segment.model_dump() for segment in segments],
+        )
+        nudges = [
+            nudge
+            for timestamp, violations in results
+            for nudge in compliance_checker.to_nudges(session_id, timestamp, violations)
+        ]
+        
+        if nudges:
+            logger.warning(f"Compliance issues detected in session {session_id}")
+            # One nudges frame per segment, pushed like single-segment nudges
+            for timestamp, violations in results:
+                if violations:
+                    await websocket_manager.publish_violations(session_id, violations, timestamp)
+        
+        return {
+            "nudges": [ComplianceNudge(**n) for n in nudges],
+            "processed": len(segments),
+        }
+    
+    except Exception as e:
+        logger.error(f"Error processing transcript batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/sessions/{session_id}/nudges")
 async def get_session_nudges(session_id: str) -> List[ComplianceNudge]:
     """
     Get all nudges generated during a session
     """
-    copilot_service = CopilotService()
     nudges = await copilot_service.get_nudges(session_id)
     
     return [ComplianceNudge(**n) for n in nudges]
@@ -165,12 +218,20 @@ async def update_session_context(
     Update session context (e.g., product being discussed, doctor concerns)
     This helps the compliance engine provide more accurate guidance
     """
-    copilot_service = CopilotService()
     await copilot_service.update_context(session_id, context)
     
     return {"message": "Context updated", "session_id": session_id}
 
 
+@router.get("/compliance/cache")
+async def get_compliance_cache_stats() -> Dict:
+    """
+    Get hit and miss counters for the compliance result cache
+    """
+    engine = await compliance_checker.get_engine()
+    return engine.cache_stats()
+
+
 @router.get("/products")
 async def get_available_products() -> List[Dict]:
     """
@@ -0,0 +1,5 @@
+"""
+Veritas Benchmarks Package
+Run individual benchmarks from the backend directory, e.g.
+python -m benchmarks.compliance_benchmark
+"""
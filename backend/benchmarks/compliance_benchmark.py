@@ -0,0 +1,122 @@
+"""
+Compliance Engine Benchmark
+Measures how check_text latency grows with the size of the rule set
+
+Usage (from the backend directory):
+    python -m benchmarks.compliance_benchmark
+    python -m benchmarks.compliance_benchmark --sizes 8 100 1000 5000 --repeat 200
+"""
+
+from typing import List
+from loguru import logger
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from services.compliance_engine import ComplianceEngine, ComplianceRule
+
+
+PRODUCT_STEMS = ["gluco", "cardio", "neuro", "pulmo", "derma", "onco", "immuno", "hepa"]
+PRODUCT_SUFFIXES = ["max", "guard", "vex", "zen", "pril", "tide", "mab", "lix"]
+CONDITIONS = [
+    "weight loss", "pcos", "prediabetes", "heart failure", "atrial fibrillation",
+    "migraine", "insomnia", "anxiety", "psoriasis", "asthma", "gout", "acne",
+]
+REGIONS = ["texas", "ontario", "bavaria", "kyoto", "lombardy", "quebec", "victoria", "wales"]
+
+SEGMENTS = [
+    "In clinical trials, 78% of patients achieved a 1.5% reduction in A1C.",
+    "The most common side effects include nausea and headache.",
+    "Would you like to see the prescribing information for your patients?",
+    "Our reimbursement team can help with coverage questions.",
+    "Let me walk you through the dosing schedule approved by the FDA.",
+    "The study enrolled adults with type 2 diabetes across forty sites.",
+    "You can use it for weight loss, many doctors use it for that.",
+    "Don't worry about side effects, they're minimal.",
+]
+
+
+def make_rules(count: int, seed: int = 7) -> List[ComplianceRule]:
+    """Generate synthetic product- and region-specific rules"""
+    rng = random.Random(seed)
+    rules = []
+    for index in range(count):
+        product = rng.choice(PRODUCT_STEMS) + rng.choice(PRODUCT_SUFFIXES) + str(index)
+        condition = rng.choice(CONDITIONS)
+        region = rng.choice(REGIONS)
+        rules.append(ComplianceRule(
+            rule_id=f"synthetic_{index:05d}",
+            name=f"{product} off-label use ({region})",
+            category="off_label",
+            patterns=[
+                rf"(use|prescribe) {product} for {condition}",
+                rf"{product} (is|was) (approved|cleared) in {region}",
+            ],
+            severity=rng.choice(["critical", "warning", "info"]),
+            message="Synthetic benchmark rule",
+        ))
+    return rules
+
+
+async def build_engine(size: int) -> ComplianceEngine:
+    """Build an engine with the default rules padded to size"""
+    engine = ComplianceEngine()
+    await engine.initialize()
+    engine.add_custom_rules(make_rules(max(0, size - len(engine.rules))))
+    return engine
+
+
+def time_per_check(check, segments: List[str], repeat: int) -> float:
+    """Median microseconds per segment for a check callable"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for segment in segments:
+            check(segment)
+        samples.append((time.perf_counter() - start) / len(segments))
+    return statistics.median(samples) * 1e6
+
+
+async def run(sizes: List[int], repeat: int):
+    """Run the benchmark and print a latency table"""
+    print(
+        f"{'rules':>7} {'per-rule loop (us)':>20} {'single scan (us)':>18} "
+        f"{'prefiltered (us)':>18} {'speedup':>9}"
+    )
+    for size in sizes:
+        engine = await build_engine(size)
+        
+        def per_rule_loop(text: str):
+            return [rule for rule in engine.rules if rule.check(text)]
+        
+        baseline = time_per_check(per_rule_loop, SEGMENTS, repeat)
+        scanned = time_per_check(engine.matcher.scan, SEGMENTS, repeat)
+        prefiltered = time_per_check(engine.matcher.match, SEGMENTS, repeat)
+        
+        # Every path must agree on which rules fire
+        for segment in SEGMENTS:
+            expected = per_rule_loop(segment)
+            assert engine.matcher.scan(segment) == expected
+            assert engine.matcher.match(segment) == expected
+        
+        print(
+            f"{len(engine.rules):>7} {baseline:>20.1f} {scanned:>18.1f} "
+            f"{prefiltered:>18.1f} {baseline / prefiltered:>8.1f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ComplianceEngine check latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 50, 500, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    
+    # Keep rule loading logs out of the timing output
+    logger.remove()
+    asyncio.run(run(args.sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
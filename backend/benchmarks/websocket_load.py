@@ -0,0 +1,350 @@
+"""
+WebSocket Load Generator
+Opens N concurrent /ws/{session_id} sessions streaming rep and doctor
+transcripts plus audio chunks, and reports time to nudge, throughput and
+server memory
+
+Audio is synthesized speech (voiced phrases between pauses) rather than
+noise, so VAD, endpointing and ASR load match a real call
+
+A rule nudges each session at most once per NUDGE_SUPPRESSION_SECONDS, so
+run the server with suppression off to time every violating segment:
+    NUDGE_SUPPRESSION_SECONDS=0 MAX_CONCURRENT_SESSIONS=1000 uvicorn main:app --port 8000
+
+Usage (from the backend directory):
+    python -m benchmarks.websocket_load
+    python -m benchmarks.websocket_load --sessions 200 --duration 60 --transcript-rate 0.5
+    python -m benchmarks.websocket_load --sessions 50 --fail-p99-ms 250
+"""
+
+from typing import Dict, List
+import argparse
+import asyncio
+import base64
+import json
+import math
+import random
+import sys
+import time
+
+import httpx
+import msgpack
+import numpy as np
+import websockets
+from websockets.exceptions import ConnectionClosed
+
+from benchmarks.compliance_benchmark import SEGMENTS
+from services.ws_protocol import SUBPROTOCOL_MSGPACK, encode_audio_frame
+
+
+# Rep lines that trip the default rules
+VIOLATING_SEGMENTS = [
+    "You can use it for weight loss, many doctors use it for that.",
+    "Don't worry about side effects, they're minimal.",
+    "Honestly it is 100% effective, guaranteed to work for your patients.",
+    "It's the best medication on the market, better than anything else.",
+]
+
+# Rep lines that should not
+CLEAN_SEGMENTS = [segment for segment in SEGMENTS if segment not in VIOLATING_SEGMENTS]
+
+DOCTOR_SEGMENTS = [
+    "What does the safety profile look like in older patients?",
+    "I have a few patients with kidney issues, is dosing different?",
+    "How does this compare with what I'm prescribing now?",
+    "Is it covered by most of the plans in this area?",
+]
+
+# WebSocket close code the server uses when it is at capacity
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class LoadStats:
+    """Counters and samples shared by every simulated session"""
+    
+    def __init__(self):
+        self.opened = 0
+        self.refused = 0
+        self.errors = 0
+        self.transcripts = 0
+        self.violating = 0
+        self.audio_chunks = 0
+        self.nudge_frames = 0
+        self.nudges = 0
+        self.latencies: List[float] = []
+        self.memory: List[int] = []
+        self.server_sessions = 0
+        self.elapsed = 0.0
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """Nearest-rank percentile of unsorted samples"""
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _jittered(interval: float, rng: random.Random) -> float:
+    """Spread sends out so sessions do not fire in lockstep"""
+    return interval * rng.uniform(0.5, 1.5)
+
+
+async def _receive(websocket, pending: Dict[str, float], stats: LoadStats):
+    """Match nudges frames back to the transcript that triggered them"""
+    async for frame in websocket:
+        message = json.loads(frame) if isinstance(frame, str) else msgpack.unpackb(frame)
+        if message.get("type") != "nudges":
+            continue
+        stats.nudge_frames += 1
+        stats.nudges += len(message.get("nudges", []))
+        sent_at = pending.pop(message.get("segment_id"), None)
+        if sent_at is not None:
+            stats.latencies.append(time.perf_counter() - sent_at)
+
+
+async def _send(websocket, codec_msgpack: bool, message: Dict):
+    if codec_msgpack:
+        await websocket.send(msgpack.packb(message))
+    else:
+        await websocket.send(json.dumps(message))
+
+
+async def _send_transcripts(websocket, session_id: str, args, stats: LoadStats,
+                            pending: Dict[str, float], stop_at: float, rng: random.Random):
+    """Alternate rep and doctor segments at --transcript-rate per session"""
+    interval = 1.0 / args.transcript_rate
+    index = 0
+    while time.perf_counter() < stop_at:
+        await asyncio.sleep(_jittered(interval, rng))
+        segment_id = f"{session_id}-{index}"
+        index += 1
+        
+        if rng.random() < args.rep_share:
+            speaker = "rep"
+            if rng.random() < args.violation_ratio:
+                text = rng.choice(VIOLATING_SEGMENTS)
+                pending[segment_id] = time.perf_counter()
+                stats.violating += 1
+            else:
+                text = rng.choice(CLEAN_SEGMENTS)
+        else:
+            speaker = "doctor"
+            text = rng.choice(DOCTOR_SEGMENTS)
+        
+        await _send(websocket, args.msgpack, {
+            "type": "transcript",
+            "speaker": speaker,
+            "text": text,
+            "timestamp": time.time(),
+            "segment_id": segment_id,
+            "is_final": True,
+        })
+        stats.transcripts += 1
+
+
+def speech_like_pcm(sample_rate: int, seconds: float, rng: random.Random) -> bytes:
+    """
+    Synthesized speech-shaped 16-bit mono PCM
+    Phrases of voiced syllables (a gliding pitch with falling harmonics, about
+    four syllables a second) alternate with pauses, so the server's VAD and
+    endpointer see talk spurts and silences the way they do on a call,
+    unlike white noise, which is voiced end to end
+    """
+    chunks = []
+    while sum(len(chunk) for chunk in chunks) < seconds * sample_rate:
+        phrase = np.arange(int(rng.uniform(1.0, 2.5) * sample_rate)) / sample_rate
+        pitch = rng.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.3, 1.0) * phrase))
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 9))
+        syllables = np.abs(np.sin(np.pi * rng.uniform(3.0, 5.0) * phrase)) ** 0.7
+        chunks.append(0.15 * voiced * syllables)
+        chunks.append(np.zeros(int(rng.uniform(0.4, 1.2) * sample_rate)))
+    
+    samples = np.concatenate(chunks)[: int(seconds * sample_rate)]
+    samples += np.random.default_rng(rng.getrandbits(32)).normal(0, 0.002, len(samples))
+    return (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+async def _send_audio(websocket, args, stats: LoadStats, stop_at: float, rng: random.Random):
+    """Stream speech-shaped PCM16 audio chunks at --audio-rate per session"""
+    if args.audio_rate <= 0:
+        return
+    interval = 1.0 / args.audio_rate
+    # A loop of synthetic speech, cut into chunks covering one interval each
+    audio = speech_like_pcm(args.sample_rate, 10.0, rng)
+    chunk_bytes = int(args.sample_rate * interval) * 2
+    offset = 0
+    sequence = 0
+    while time.perf_counter() < stop_at:
+        await asyncio.sleep(interval)
+        payload = audio[offset:offset + chunk_bytes]
+        if len(payload) < chunk_bytes:
+            payload += audio[:chunk_bytes - len(payload)]
+        offset = (offset + chunk_bytes) % len(audio)
+        if args.json_audio:
+            await _send(websocket, args.msgpack, {
+                "type": "audio_chunk",
+                "audio": base64.b64encode(payload).decode(),
+                "timestamp": time.time(),
+                "sequence": sequence,
+            })
+        else:
+            await websocket.send(encode_audio_frame(sequence, time.time(), payload))
+        sequence += 1
+        stats.audio_chunks += 1
+
+
+async def run_session(index: int, args, stats: LoadStats, stop_at: float):
+    """One simulated call: connect, stream until stop_at, then drain nudges"""
+    rng = random.Random(args.seed + index)
+    session_id = f"load-{index:05d}-{rng.getrandbits(32):08x}"
+    subprotocols = [SUBPROTOCOL_MSGPACK] if args.msgpack else None
+    pending: Dict[str, float] = {}
+    
+    try:
+        async with websockets.connect(
+            f"{args.url}/ws/{session_id}", subprotocols=subprotocols, max_size=None,
+        ) as websocket:
+            receiver = asyncio.create_task(_receive(websocket, pending, stats))
+            senders = asyncio.gather(
+                _send_transcripts(websocket, session_id, args, stats, pending, stop_at, rng),
+                _send_audio(websocket, args, stats, stop_at, rng),
+            )
+            done, _ = await asyncio.wait({receiver, senders}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                # The server closed the socket (e.g. refused at capacity)
+                senders.cancel()
+                await asyncio.gather(senders, return_exceptions=True)
+                receiver.result()
+                stats.errors += 1
+            else:
+                senders.result()
+                stats.opened += 1
+                # Give in-flight segments time to be nudged
+                drain_until = time.perf_counter() + args.drain
+                while pending and time.perf_counter() < drain_until:
+                    await asyncio.sleep(0.05)
+                receiver.cancel()
+                await asyncio.gather(receiver, return_exceptions=True)
+    except ConnectionClosed as e:
+        if e.rcvd is not None and e.rcvd.code == CLOSE_TRY_AGAIN_LATER:
+            stats.refused += 1
+        else:
+            stats.errors += 1
+    except (OSError, asyncio.TimeoutError, websockets.InvalidHandshake) as e:
+        stats.errors += 1
+        if stats.errors == 1:
+            print(f"Connection error: {e!r}", file=sys.stderr)
+
+
+async def sample_server(metrics_url: str, stats: LoadStats, interval: float):
+    """Poll the server's /metrics for resident memory and connected sessions"""
+    async with httpx.AsyncClient(timeout=interval) as client:
+        while True:
+            try:
+                response = await client.get(metrics_url)
+                for line in response.text.splitlines():
+                    if line.startswith("process_resident_memory_bytes "):
+                        stats.memory.append(int(float(line.split()[1])))
+                    elif line.startswith("veritas_websocket_sessions "):
+                        stats.server_sessions = max(stats.server_sessions, int(float(line.split()[1])))
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(interval)
+
+
+async def run(args) -> LoadStats:
+    stats = LoadStats()
+    metrics_url = args.url.replace("ws", "http", 1) + "/metrics"
+    sampler = asyncio.create_task(sample_server(metrics_url, stats, 0.5))
+    # Let the sampler record a baseline before any session connects
+    await asyncio.sleep(0.6)
+    
+    started = time.perf_counter()
+    stop_at = started + args.ramp + args.duration
+    
+    async def staggered(index: int):
+        await asyncio.sleep(args.ramp * index / max(1, args.sessions))
+        await run_session(index, args, stats, stop_at)
+    
+    await asyncio.gather(*[staggered(i) for i in range(args.sessions)])
+    stats.elapsed = time.perf_counter() - started
+    sampler.cancel()
+    await asyncio.gather(sampler, return_exceptions=True)
+    return stats
+
+
+def report(args, stats: LoadStats) -> Dict:
+    """Print a summary and return it as a dict"""
+    latencies_ms = [latency * 1000 for latency in stats.latencies]
+    summary = {
+        "sessions": args.sessions,
+        "opened": stats.opened,
+        "refused": stats.refused,
+        "errors": stats.errors,
+        "peak_server_sessions": stats.server_sessions,
+        "elapsed_seconds": round(stats.elapsed, 2),
+        "transcripts": stats.transcripts,
+        "audio_chunks": stats.audio_chunks,
+        "messages_per_second": round((stats.transcripts + stats.audio_chunks) / stats.elapsed, 1),
+        "violating_segments": stats.violating,
+        "nudged_segments": len(latencies_ms),
+        "nudges": stats.nudges,
+        "nudge_p50_ms": round(percentile(latencies_ms, 50), 2),
+        "nudge_p95_ms": round(percentile(latencies_ms, 95), 2),
+        "nudge_p99_ms": round(percentile(latencies_ms, 99), 2),
+        "nudge_max_ms": round(max(latencies_ms), 2) if latencies_ms else None,
+    }
+    if stats.memory:
+        baseline, peak = stats.memory[0], max(stats.memory)
+        summary["server_memory_baseline_mb"] = round(baseline / 2**20, 1)
+        summary["server_memory_peak_mb"] = round(peak / 2**20, 1)
+        if stats.server_sessions:
+            summary["server_memory_per_session_kb"] = round((peak - baseline) / stats.server_sessions / 1024, 1)
+    
+    width = max(len(key) for key in summary)
+    for key, value in summary.items():
+        print(f"{key:<{width}}  {value}")
+    if stats.violating and len(latencies_ms) < stats.violating:
+        print(
+            f"note: {stats.violating - len(latencies_ms)} violating segments were not nudged "
+            "(suppressed, shed, or still in flight)"
+        )
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the /ws copilot endpoint")
+    parser.add_argument("--url", default="ws://localhost:8000", help="Server base URL")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent WebSocket sessions")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds each session streams")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which sessions connect")
+    parser.add_argument("--transcript-rate", type=float, default=0.5, help="Transcript segments per second per session")
+    parser.add_argument("--audio-rate", type=float, default=10.0, help="Audio chunks per second per session (0 disables)")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="PCM sample rate of generated audio")
+    parser.add_argument("--rep-share", type=float, default=0.6, help="Fraction of segments spoken by the rep")
+    parser.add_argument("--violation-ratio", type=float, default=0.3, help="Fraction of rep segments that break a rule")
+    parser.add_argument("--drain", type=float, default=5.0, help="Seconds to wait for outstanding nudges")
+    parser.add_argument("--msgpack", action="store_true", help="Negotiate the MessagePack subprotocol")
+    parser.add_argument("--json-audio", action="store_true", help="Send base64 JSON audio instead of binary frames")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Also write the summary as JSON to this file")
+    parser.add_argument("--fail-p99-ms", type=float, help="Exit non-zero if p99 time to nudge exceeds this")
+    args = parser.parse_args()
+    
+    stats = asyncio.run(run(args))
+    summary = report(args, stats)
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    
+    if args.fail_p99_ms is not None and not summary["nudge_p99_ms"] <= args.fail_p99_ms:
+        print(f"FAIL: p99 time to nudge {summary['nudge_p99_ms']} ms > {args.fail_p99_ms} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
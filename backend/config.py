@@ -33,15 +33,39 @@ class Settings(BaseSettings):
     MAX_AUDIO_RETENTION_SECONDS: int = 0  # 0 means immediate deletion
     ENABLE_SLIDING_WINDOW: bool = True
     WINDOW_SIZE_SECONDS: int = 30  # Keep last 30 seconds in memory
+    WINDOW_MAX_SEGMENTS: int = 200  # Hard cap on segments held per session
     
     # Real-time Processing
     AUDIO_SAMPLE_RATE: int = 16000
     AUDIO_CHUNK_DURATION_MS: int = 100
-    TRANSCRIPTION_PROVIDER: str = "whisper"  # or "deepgram"
+    TRANSCRIPTION_PROVIDER: str = "whisper"  # "whisper" (local, offline) or "mock" (scripted lines, tests only); audio is not transcribed if unavailable
+    TRANSCRIPTION_POOL_WORKERS: int = 0  # 0 means CPU cores / TRANSCRIPTION_WORKER_THREADS; each worker holds its own model copy
+    TRANSCRIPTION_WORKER_THREADS: int = 1  # torch intra-op threads per transcription worker
+    WHISPER_MODEL: str = "base.en"  # Model loaded by each transcription worker
+    AUDIO_VAD_MODE: int = 2  # WebRTC VAD aggressiveness, 0 (least) to 3 (most)
+    AUDIO_VAD_FRAME_MS: int = 30  # VAD frame length: 10, 20 or 30 ms
+    AUDIO_VAD_PADDING_MS: int = 300  # Audio kept after speech stops, so word endings are not clipped
+    AUDIO_SILENCE_FLOOR_DBFS: float = -50.0  # Frames quieter than this skip the VAD
+    AUDIO_SPEAKER_MARGIN_DB: float = 6.0  # How much louder a channel must be to take the turn
+    AUDIO_TRANSCRIBED_SPEAKERS: List[str] = ["rep"]  # Other speakers' audio skips ASR and compliance
+    AUDIO_JITTER_TARGET_MS: int = 60  # How long chunks behind a gap wait for the missing one
+    AUDIO_JITTER_MAX_CHUNKS: int = 50  # Held chunks per session before a gap is given up on
+    AUDIO_JITTER_MAX_GAP_MS: int = 200  # Longer gaps are skipped instead of filled with silence
+    ENDPOINT_SILENCE_MS: int = 200  # Unvoiced audio (after VAD padding) that ends an utterance
+    ENDPOINT_PARTIAL_INTERVAL_MS: int = 600  # Speech between partial transcripts
+    ENDPOINT_MAX_UTTERANCE_MS: int = 15000  # Longer utterances are cut into segments
+    ENDPOINT_MIN_SPEECH_MS: int = 240  # Utterances with less VAD-voiced speech (clicks, coughs) are not transcribed
     
     # Compliance Engine
     COMPLIANCE_CHECK_THRESHOLD: float = 0.7  # Confidence threshold for flagging
+    RULE_PACK_PATHS: List[str] = ["rules"]  # JSON/YAML rule pack files or directories
+    RULE_PACK_CACHE_DIR: str = ".rule_cache"  # Compiled rule packs, keyed by content hash
     ENABLE_REAL_TIME_CHECKS: bool = True
+    COMPLIANCE_CHECK_BUDGET_MS: int = 50  # Time budget per check for super-linear patterns
+    COMPLIANCE_STREAM_OVERLAP_CHARS: int = 200  # Text carried over between transcript segments
+    COMPLIANCE_RESULT_CACHE_SIZE: int = 4096  # Memoized check results (0 disables the cache)
+    COMPLIANCE_BATCH_POOL_THRESHOLD: int = 500  # Batches this large are spread over worker processes
+    COMPLIANCE_POOL_WORKERS: int = 0  # 0 means one worker per CPU core
     
     # Training Mode
     TRAINING_DIFFICULTY_LEVELS: List[str] = ["beginner", "intermediate", "expert"]
@@ -50,6 +74,17 @@ class Settings(BaseSettings):
     # Performance
     MAX_CONCURRENT_SESSIONS: int = 100
     RESPONSE_TIMEOUT_SECONDS: int = 5
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5  # Retry hint for refused sessions
+    ADMISSION_CONNECT_GRACE_SECONDS: int = 30  # How long a started session holds a slot before its socket connects
+    SESSION_QUEUE_MAXSIZE: int = 32  # Transcript segments queued per WebSocket session
+    WEBSOCKET_SEND_TIMEOUT_SECONDS: float = 2.0  # Slower clients are evicted
+    WEBSOCKET_FANOUT_CONCURRENCY: int = 64  # Concurrent sends for broadcast/disconnect_all
+    NUDGE_SUPPRESSION_SECONDS: int = 30  # Don't repeat a rule's nudge within this window
+    WEBSOCKET_HEARTBEAT_SECONDS: float = 15.0  # Server heartbeat and reaper interval (0 disables)
+    WEBSOCKET_DEAD_AFTER_SECONDS: float = 0.0  # Close sockets that send no frame this long (0 disables)
+    WEBSOCKET_IDLE_TIMEOUT_SECONDS: float = 600.0  # Close sessions with no audio or transcripts this long
+    BACKPLANE: str = "local"  # "local" for one worker, "redis" for uvicorn --workers > 1
+    BACKPLANE_CHANNEL_PREFIX: str = "veritas"  # Redis pub/sub channel namespace
     
     class Config:
         env_file = ".env"
@@ -5,7 +5,7 @@ Real-Time Compliance Copilot
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import uvicorn
 from loguru import logger
@@ -13,7 +13,11 @@ import sys
 
 from api import training_router, copilot_router, analytics_router, auth_router
 from services.websocket_manager import websocket_manager
-from services.compliance_engine import ComplianceEngine
+from services.copilot_service import copilot_service
+from services.backplane import backplane
+from services.metrics import metrics
+from services.transcription import transcription_backend
+from services.engine_registry import compliance_registry
 from config import settings
 
 # Configure logging
@@ -39,18 +43,27 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Privacy Mode: Sliding Window Enabled={settings.ENABLE_SLIDING_WINDOW}")
     
-    # Initialize compliance engine
-    compliance_engine = ComplianceEngine()
-    await compliance_engine.initialize()
+    # Initialize the shared compliance engine
+    compliance_engine = await compliance_registry.get_engine()
     app.state.compliance_engine = compliance_engine
     
+    # Route session traffic between workers
+    await backplane.start(websocket_manager.handle_backplane_command, copilot_service.apply_event)
+    
+    # Heartbeat live sockets and reap dead or idle sessions
+    await websocket_manager.start_heartbeat()
+    
     logger.success("✅ Veritas backend started successfully")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down Veritas backend...")
+    await websocket_manager.stop_heartbeat()
     await websocket_manager.disconnect_all()
+    await backplane.stop()
+    compliance_registry.shutdown()
+    transcription_backend.shutdown()
     logger.success("✅ Graceful shutdown complete")
 
 
@@ -86,6 +99,38 @@ async def health_check():
     )
 
 
+# Prometheus metrics endpoint
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Pipeline latency histograms and counters in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# Read at scrape time from state the services already keep
+metrics.gauge(
+    "veritas_websocket_sessions",
+    "WebSocket sessions connected to this worker",
+    lambda: len(websocket_manager.active_connections),
+)
+metrics.gauge(
+    "veritas_transcripts_queued",
+    "Transcript segments waiting in session queues",
+    lambda: sum(len(data["queue"]) for data in websocket_manager.session_data.values()),
+)
+metrics.gauge(
+    "veritas_result_cache_hits_total",
+    "Compliance result cache hits",
+    lambda: app.state.compliance_engine.cache.hits,
+    kind="counter",
+)
+metrics.gauge(
+    "veritas_result_cache_misses_total",
+    "Compliance result cache misses",
+    lambda: app.state.compliance_engine.cache.misses,
+    kind="counter",
+)
+
+
 # Include routers
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(training_router, prefix="/api/training", tags=["Training"])
@@ -100,13 +145,16 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     WebSocket endpoint for real-time copilot communication
     Handles audio streaming and real-time compliance checking
     """
-    await websocket_manager.connect(websocket, session_id)
+    if not await websocket_manager.connect(websocket, session_id):
+        return
     logger.info(f"WebSocket connected: {session_id}")
     
     try:
         while True:
-            # Receive audio data or messages
-            data = await websocket.receive_json()
+            # Receive audio data (binary frames) or messages
+            data = await websocket_manager.receive_message(websocket, session_id)
+            if data is None:
+                continue
             
             # Process based on message type
             message_type = data.get("type")
@@ -115,13 +163,21 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 # Handle audio streaming
                 await websocket_manager.handle_audio_chunk(session_id, data)
             
+            elif message_type == "audio_end":
+                # End of the audio stream: finalize the current utterance
+                await websocket_manager.end_audio(session_id)
+            
+            elif message_type == "audio_config":
+                # Capture format for the session's audio chunks
+                await websocket_manager.configure_audio(session_id, data)
+            
             elif message_type == "transcript":
-                # Handle transcript for compliance checking
-                await websocket_manager.handle_transcript(session_id, data)
+                # Queue for compliance checking so the socket keeps being read
+                await websocket_manager.enqueue_transcript(session_id, data)
             
             elif message_type == "ping":
                 # Keep-alive
-                await websocket.send_json({"type": "pong"})
+                await websocket_manager.send_message(session_id, {"type": "pong"})
             
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected: {session_id}")
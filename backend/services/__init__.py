@@ -4,6 +4,7 @@ Veritas Services Package
 
 from .compliance_engine import ComplianceEngine
 from .websocket_manager import websocket_manager
+from .engine_registry import compliance_registry
 from .ai_doctor import AIDoctorService
 from .training_service import TrainingService
 from .copilot_service import CopilotService
@@ -12,6 +13,7 @@ from .analytics_service import AnalyticsService
 __all__ = [
     "ComplianceEngine",
     "websocket_manager",
+    "compliance_registry",
     "AIDoctorService",
     "TrainingService",
     "CopilotService",
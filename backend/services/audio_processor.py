@@ -1,40 +1,277 @@
 """
 Audio Processor Service
 Handles audio processing, transcription, and streaming
+Incoming PCM is decoded, resampled and VAD-gated so silence never reaches ASR
 """
 
-from typing import Optional
-from loguru import logger
+from typing import Iterator, List, Optional, Tuple, Union
+import numpy as np
+import webrtcvad
 
 from config import settings
+from services.endpointer import Endpointer, Utterance
+from services.transcription import transcription_backend
+
+
+# Sample rates and frame lengths WebRTC VAD accepts
+VAD_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+VAD_FRAME_MS = (10, 20, 30)
+
+AudioData = Union[bytes, bytearray, memoryview]
+
+
+def decode_pcm16(data: AudioData, channels: int = 1) -> np.ndarray:
+    """
+    Decode little-endian 16-bit PCM into float32 samples in [-1, 1)
+    Interleaved multi-channel input is returned as (frames, channels)
+    """
+    samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    if channels > 1:
+        samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels)
+    return samples
+
+
+def encode_pcm16(samples: np.ndarray) -> np.ndarray:
+    """Float samples back to int16, clipped"""
+    return np.clip(np.rint(samples * 32768.0), -32768, 32767).astype(np.int16)
+
+
+class Resampler:
+    """
+    Streaming sample rate converter for (samples,) or (samples, channels)
+    Integer downsampling ratios (48k -> 16k) average each block of input
+    samples, which also low-passes before decimating; other ratios use linear
+    interpolation. State is carried between chunks, so chunk boundaries do not
+    click or drift.
+    """
+    
+    def __init__(self, input_rate: int, output_rate: int):
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.step = input_rate / output_rate
+        self.factor = input_rate // output_rate if input_rate % output_rate == 0 else 0
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._position = 0.0
+    
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.input_rate == self.output_rate:
+            return samples
+        
+        buffer = np.concatenate((self._pending, samples)) if len(self._pending) else samples
+        
+        if self.factor:
+            usable = len(buffer) - len(buffer) % self.factor
+            self._pending = buffer[usable:]
+            blocks = buffer[:usable].reshape(-1, self.factor, *buffer.shape[1:])
+            return blocks.mean(axis=1, dtype=np.float32)
+        
+        # Output sample k sits at input position _position + k * step
+        last = len(buffer) - 1
+        if last <= self._position:
+            self._pending = buffer
+            return np.zeros((0, *buffer.shape[1:]), dtype=np.float32)
+        count = int(np.ceil((last - self._position) / self.step))
+        positions = self._position + self.step * np.arange(count)
+        indexes = np.arange(len(buffer))
+        if buffer.ndim == 1:
+            output = np.interp(positions, indexes, buffer).astype(np.float32)
+        else:
+            output = np.stack(
+                [np.interp(positions, indexes, channel) for channel in buffer.T], axis=1,
+            ).astype(np.float32)
+        
+        # Keep the last input sample to interpolate across the next boundary
+        self._position += self.step * count - last
+        self._pending = buffer[last:]
+        return output
+
+
+class AudioStream:
+    """
+    Per-session audio front-end: PCM decode, resample to AUDIO_SAMPLE_RATE,
+    then WebRTC VAD in fixed frames
+    
+    Frames whose energy is below AUDIO_SILENCE_FLOOR_DBFS are rejected in one
+    vectorized pass without calling the VAD. Voiced audio stays open for
+    AUDIO_VAD_PADDING_MS after speech stops, so word endings are not clipped.
+    
+    Multi-channel audio whose client names a speaker per channel (rep mic and
+    doctor line of a virtual call) is attributed per frame: the channel at
+    least AUDIO_SPEAKER_MARGIN_DB louder than the others, and above the
+    silence floor, has the turn, and its audio alone goes on to VAD and
+    transcription. Frames with no clear winner (cross-talk or silence) keep
+    the previous speaker. Other multi-channel audio is downmixed.
+    """
+    
+    def __init__(self, input_rate: Optional[int] = None, channels: int = 1):
+        self.sample_rate = settings.AUDIO_SAMPLE_RATE
+        if self.sample_rate not in VAD_SAMPLE_RATES:
+            raise ValueError(f"AUDIO_SAMPLE_RATE must be one of {VAD_SAMPLE_RATES} for VAD")
+        if settings.AUDIO_VAD_FRAME_MS not in VAD_FRAME_MS:
+            raise ValueError(f"AUDIO_VAD_FRAME_MS must be one of {VAD_FRAME_MS}")
+        
+        self.frame_samples = self.sample_rate * settings.AUDIO_VAD_FRAME_MS // 1000
+        self.padding_frames = settings.AUDIO_VAD_PADDING_MS // settings.AUDIO_VAD_FRAME_MS
+        self.silence_floor = 10 ** (settings.AUDIO_SILENCE_FLOOR_DBFS / 20)
+        self.speaker_margin = 10 ** (settings.AUDIO_SPEAKER_MARGIN_DB / 20)
+        self.vad = webrtcvad.Vad(settings.AUDIO_VAD_MODE)
+        
+        self.frames_total = 0
+        self.frames_voiced = 0
+        self.frames_skipped = 0
+        self.configure(input_rate or self.sample_rate, channels)
+    
+    def configure(self, input_rate: int, channels: int = 1, speakers: Optional[List[str]] = None):
+        """
+        Set the client's capture format, dropping any buffered audio
+        speakers names the speaker on each channel; without it,
+        multi-channel audio is downmixed
+        """
+        if input_rate <= 0 or channels <= 0:
+            raise ValueError(f"Invalid audio format: {input_rate} Hz, {channels} channels")
+        if speakers is not None and (len(speakers) != channels or not all(isinstance(s, str) for s in speakers)):
+            raise ValueError(f"Expected one speaker name per channel, got {speakers!r}")
+        
+        self.input_rate = input_rate
+        self.channels = channels
+        self.speakers = list(speakers) if speakers and channels > 1 else None
+        self.resampler = Resampler(input_rate, self.sample_rate)
+        self._carry = b""
+        self._buffer = np.zeros((0, channels) if self.speakers else 0, dtype=np.int16)
+        self._hangover = 0
+        self._channel = 0
+    
+    def _attribute(self, frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pick the speaking channel of each (frame, samples, channel) frame
+        Returns the channel index, its samples and its RMS for every frame
+        """
+        count = len(frames)
+        rows = np.arange(count)
+        energy = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1)) / 32768.0
+        
+        order = np.argsort(energy, axis=1)
+        loudest = order[:, -1]
+        # Silence is no one's turn: with every channel at zero, the "loudest"
+        # is just the last index
+        clear = (energy[rows, loudest] >= energy[rows, order[:, -2]] * self.speaker_margin) & (
+            energy[rows, loudest] >= self.silence_floor
+        )
+        
+        # Cross-talk frames keep the last clear speaker (vectorized forward fill)
+        last_clear = np.maximum.accumulate(np.where(clear, rows, -1))
+        channel = np.where(last_clear >= 0, loudest[np.maximum(last_clear, 0)], self._channel)
+        self._channel = int(channel[-1])
+        
+        samples = np.take_along_axis(frames, channel[:, None, None], axis=2)[:, :, 0]
+        return channel, samples, energy[rows, channel]
+    
+    def frames(self, data: AudioData) -> Iterator[Tuple[np.ndarray, bool, bool, Optional[str]]]:
+        """
+        Yield (int16 frame, voiced, padded, speaker) for every complete VAD frame in data
+        padded marks voiced frames kept only as hangover after speech;
+        speaker is None unless channels are attributed to speakers
+        """
+        # A chunk can split a sample (or a multi-channel frame) across messages.
+        # Only then is the chunk copied; otherwise it is decoded in place
+        frame_bytes = 2 * self.channels
+        if self._carry:
+            data = b"".join((self._carry, data))
+        usable = len(data) - len(data) % frame_bytes
+        # At most one partial frame is kept, copied so the chunk can be released
+        self._carry = bytes(data[usable:])
+        
+        samples = decode_pcm16(memoryview(data)[:usable], self.channels)
+        if self.channels > 1 and not self.speakers:
+            samples = samples.mean(axis=1, dtype=np.float32)
+        samples = encode_pcm16(self.resampler.process(samples))
+        
+        buffer = np.concatenate((self._buffer, samples)) if len(self._buffer) else samples
+        count = len(buffer) // self.frame_samples
+        self._buffer = buffer[count * self.frame_samples:]
+        if count == 0:
+            return
+        
+        frames = buffer[: count * self.frame_samples].reshape(count, self.frame_samples, *buffer.shape[1:])
+        if self.speakers:
+            channels, frames, rms = self._attribute(frames)
+            speakers = [self.speakers[channel] for channel in channels]
+        else:
+            # RMS per frame in one pass
+            rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1)) / 32768.0
+            speakers = [None] * count
+        # Quiet frames never reach the VAD
+        loud = rms >= self.silence_floor
+        
+        for frame, is_loud, speaker in zip(frames, loud, speakers):
+            speech = bool(is_loud) and self.vad.is_speech(frame.tobytes(), self.sample_rate)
+            padded = False
+            if speech:
+                self._hangover = self.padding_frames
+            elif self._hangover:
+                self._hangover -= 1
+                speech = padded = True
+            
+            self.frames_total += 1
+            self.frames_voiced += speech
+            yield frame, speech, padded, speaker
+    
+    def feed(self, data: AudioData) -> np.ndarray:
+        """Voiced int16 samples from data, at AUDIO_SAMPLE_RATE"""
+        voiced = [frame for frame, speech, _, _ in self.frames(data) if speech]
+        if not voiced:
+            return np.zeros(0, dtype=np.int16)
+        return np.concatenate(voiced)
 
 
 class AudioProcessor:
     """
     Processes audio for transcription
-    In production, this would integrate with Wispr Flow or Deepgram
+    The engine is chosen by TRANSCRIPTION_PROVIDER (see services.transcription)
     """
     
     def __init__(self):
         self.sample_rate = settings.AUDIO_SAMPLE_RATE
+        self.transcribed_speakers = set(settings.AUDIO_TRANSCRIBED_SPEAKERS)
     
-    async def process_audio_chunk(self, audio_data: bytes) -> str:
+    def open_stream(self, input_rate: Optional[int] = None, channels: int = 1) -> AudioStream:
+        """Streaming front-end state for one session"""
+        return AudioStream(input_rate, channels)
+    
+    async def process_audio_chunk(self, audio_data: AudioData, stream: Optional[AudioStream] = None) -> np.ndarray:
         """
-        Process audio chunk and return transcription
-        In production, this would use Wispr Flow or Deepgram
+        Decode, resample and VAD-gate an audio chunk
+        Returns only the voiced samples, so silence never reaches transcription
         """
-        
-        # TODO: Implement actual audio processing
-        # For now, return empty string
-        logger.debug("Processing audio chunk (mock implementation)")
-        return ""
+        if stream is None:
+            stream = self.open_stream()
+        return stream.feed(audio_data)
     
-    async def transcribe(self, audio_file_path: str) -> str:
+    async def utterances(
+        self,
+        audio_data: AudioData,
+        stream: AudioStream,
+        endpointer: Endpointer,
+        timestamp: float,
+    ) -> List[Utterance]:
         """
-        Transcribe audio file
-        In production, this would use Whisper or Deepgram
+        Run a chunk through the front-end and the endpointer
+        Returns the partial and final utterances that became due
         """
-        
-        # TODO: Implement transcription using Whisper or Deepgram
-        logger.debug(f"Transcribing audio file: {audio_file_path}")
-        return ""
+        utterances = []
+        for frame, voiced, padded, speaker in stream.frames(audio_data):
+            if voiced and speaker is not None and speaker not in self.transcribed_speakers:
+                # Doctor audio skips ASR and compliance checking entirely
+                stream.frames_skipped += 1
+                voiced = False
+            utterance = endpointer.push(frame, voiced, timestamp, speaker, padded)
+            if utterance is not None:
+                utterances.append(utterance)
+        return utterances
+    
+    async def transcribe(self, samples: np.ndarray) -> str:
+        """
+        Transcribe voiced samples at AUDIO_SAMPLE_RATE
+        Runs in the transcription worker pool, off the event loop
+        """
+        return await transcription_backend.transcribe(samples, self.sample_rate)
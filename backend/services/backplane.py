@@ -0,0 +1,205 @@
+"""
+Backplane - Routes session traffic between uvicorn worker processes
+A REST call served by one worker reaches the WebSocket held by another
+"""
+
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Optional, Set
+from loguru import logger
+import asyncio
+import json
+import uuid
+
+import redis.asyncio as aioredis
+
+from config import settings
+
+
+# Called with (session_id, command) on the worker holding the session's socket
+CommandHandler = Callable[[str, Dict], Awaitable[None]]
+
+# Called with a session event published by another worker
+EventHandler = Callable[[Dict], Awaitable[None]]
+
+
+class Backplane(ABC):
+    """
+    Delivery between the workers of one deployment
+    
+    Commands ({"action": "send", "message": ...} or {"action": "close"}) go
+    to the one worker that registered the session. Events (session started,
+    context updated, ...) go to every other worker, so each keeps a replica
+    of the session state.
+    """
+    
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.on_command: Optional[CommandHandler] = None
+        self.on_event: Optional[EventHandler] = None
+    
+    async def start(self, on_command: CommandHandler, on_event: EventHandler):
+        self.on_command = on_command
+        self.on_event = on_event
+    
+    async def stop(self):
+        pass
+    
+    @abstractmethod
+    async def register(self, session_id: str):
+        """Claim a session whose socket this worker holds"""
+    
+    @abstractmethod
+    async def unregister(self, session_id: str):
+        """Release a session whose socket has closed"""
+    
+    @abstractmethod
+    async def send(self, session_id: str, command: Dict) -> bool:
+        """Route a command to the worker holding the session, False if none does"""
+    
+    @abstractmethod
+    async def publish_event(self, event: Dict):
+        """Tell the other workers about a session state change"""
+
+
+class LocalBackplane(Backplane):
+    """
+    In-process stand-in for a single worker
+    Every session is local, so commands are handed straight to the handler
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.sessions: Set[str] = set()
+    
+    async def register(self, session_id: str):
+        self.sessions.add(session_id)
+    
+    async def unregister(self, session_id: str):
+        self.sessions.discard(session_id)
+    
+    async def send(self, session_id: str, command: Dict) -> bool:
+        if session_id not in self.sessions or self.on_command is None:
+            return False
+        await self.on_command(session_id, command)
+        return True
+    
+    async def publish_event(self, event: Dict):
+        # There are no other workers to replicate to
+        pass
+
+
+class RedisBackplane(Backplane):
+    """
+    Redis pub/sub between workers
+    
+    Each worker subscribes to one channel per session it holds, so a command
+    is delivered only to the owning worker, plus a shared events channel.
+    Redis reports how many subscribers received a publish, which tells a
+    sender whether any worker holds the session.
+    """
+    
+    def __init__(self, url: Optional[str] = None, prefix: Optional[str] = None):
+        super().__init__()
+        self.url = url or settings.REDIS_URL
+        self.prefix = prefix or settings.BACKPLANE_CHANNEL_PREFIX
+        self.events_channel = f"{self.prefix}:events"
+        self._redis: Optional[aioredis.Redis] = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+    
+    def _session_channel(self, session_id: str) -> str:
+        return f"{self.prefix}:session:{session_id}"
+    
+    async def start(self, on_command: CommandHandler, on_event: EventHandler):
+        await super().start(on_command, on_event)
+        self._redis = aioredis.from_url(self.url)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.events_channel)
+        self._listener = asyncio.create_task(self._listen())
+        logger.info(f"Redis backplane started (worker {self.worker_id})")
+    
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+    
+    async def register(self, session_id: str):
+        if self._pubsub is not None:
+            await self._pubsub.subscribe(self._session_channel(session_id))
+    
+    async def unregister(self, session_id: str):
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self._session_channel(session_id))
+    
+    async def send(self, session_id: str, command: Dict) -> bool:
+        if self._redis is None:
+            return False
+        payload = json.dumps({"origin": self.worker_id, "command": command})
+        receivers = await self._redis.publish(self._session_channel(session_id), payload)
+        return receivers > 0
+    
+    async def publish_event(self, event: Dict):
+        if self._redis is None:
+            return
+        payload = json.dumps({"origin": self.worker_id, "event": event})
+        await self._redis.publish(self.events_channel, payload)
+    
+    async def _listen(self):
+        """Read the subscribed channels until stopped, reconnecting on errors"""
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backplane connection error: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            
+            if message is None or message.get("type") != "message":
+                continue
+            try:
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                envelope = json.loads(message["data"])
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Ignoring malformed backplane message: {e}")
+                continue
+            
+            # Dispatch without waiting, so one slow socket does not stall the others
+            task = asyncio.create_task(self._dispatch(channel, envelope))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+    
+    async def _dispatch(self, channel: str, envelope: Dict):
+        try:
+            if channel == self.events_channel:
+                if envelope.get("origin") != self.worker_id and self.on_event is not None:
+                    await self.on_event(envelope["event"])
+            elif self.on_command is not None:
+                session_id = channel[len(self._session_channel("")):]
+                await self.on_command(session_id, envelope["command"])
+        except Exception as e:
+            logger.error(f"Error handling backplane message on {channel}: {e}")
+
+
+def create_backplane() -> Backplane:
+    """Backplane selected by the BACKPLANE setting"""
+    if settings.BACKPLANE == "redis":
+        return RedisBackplane()
+    if settings.BACKPLANE != "local":
+        logger.warning(f"Unknown BACKPLANE {settings.BACKPLANE!r}, using local")
+    return LocalBackplane()
+
+
+# Global instance
+backplane = create_backplane()
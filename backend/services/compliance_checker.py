@@ -3,10 +3,12 @@ Compliance Checker Service
 Wrapper around compliance engine for real-time checking
 """
 
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from loguru import logger
 
 from services.compliance_engine import ComplianceEngine
+from services.copilot_service import copilot_service
+from services.engine_registry import compliance_registry
 
 
 class ComplianceChecker:
@@ -15,8 +17,41 @@ class ComplianceChecker:
     Wrapper around the compliance engine
     """
     
-    def __init__(self):
-        self.engine = ComplianceEngine()
+    async def get_engine(self) -> ComplianceEngine:
+        """Shared, initialized engine from the process-wide registry"""
+        return await compliance_registry.get_engine()
+    
+    async def find_violations(self, session_id: str, speaker: str, text: str) -> List[Dict]:
+        """Compliance violations in one transcript segment"""
+        
+        # Only check rep's speech
+        if speaker != "rep":
+            return []
+        
+        engine = await self.get_engine()
+        context = await copilot_service.get_compliance_context(session_id)
+        return await engine.check_text(text, context)
+    
+    async def find_batch_violations(
+        self,
+        session_id: str,
+        segments: List[Dict],
+    ) -> List[Tuple[float, List[Dict]]]:
+        """
+        Check a batch of transcript segments in a single engine call
+        Each segment needs speaker, text and timestamp keys
+        Returns (timestamp, violations) for each rep segment, in segment order
+        """
+        
+        # Only check rep's speech
+        rep_segments = [segment for segment in segments if segment["speaker"] == "rep"]
+        if not rep_segments:
+            return []
+        
+        engine = await self.get_engine()
+        context = await copilot_service.get_compliance_context(session_id)
+        results = await engine.check_batch([segment["text"] for segment in rep_segments], context)
+        return [(segment["timestamp"], violations) for segment, violations in zip(rep_segments, results)]
     
     async def check_transcript(
         self,
@@ -29,29 +64,41 @@ class ComplianceChecker:
         Check transcript for compliance issues
         Returns list of nudges to display
         """
-        
-        # Only check rep's speech
-        if speaker != "rep":
-            return []
-        
-        violations = await self.engine.check_text(text)
-        
-        # Convert violations to nudges
-        nudges = []
-        for violation in violations:
-            nudge = {
-                "nudge_id": f"{session_id}_{timestamp}",
-                "timestamp": timestamp,
-                "severity": violation["severity"],
-                "icon": self._get_icon(violation["severity"]),
-                "title": violation["rule_name"],
-                "message": violation["message"],
-                "suggested_response": violation.get("suggested_response"),
-                "regulation_reference": violation.get("regulation_reference"),
-            }
-            nudges.append(nudge)
-        
-        return nudges
+        violations = await self.find_violations(session_id, speaker, text)
+        return self.to_nudges(session_id, timestamp, violations)
+    
+    async def check_transcripts(
+        self,
+        session_id: str,
+        segments: List[Dict],
+    ) -> List[Dict]:
+        """
+        Check a batch of transcript segments in a single engine call
+        Returns the nudges for all segments, in segment order
+        """
+        return [
+            nudge
+            for timestamp, violations in await self.find_batch_violations(session_id, segments)
+            for nudge in self.to_nudges(session_id, timestamp, violations)
+        ]
+    
+    def to_nudges(self, session_id: str, timestamp: float, violations: List[Dict]) -> List[Dict]:
+        """Convert a segment's violations into nudges for display"""
+        return [self._to_nudge(session_id, timestamp, violation) for violation in violations]
+    
+    def _to_nudge(self, session_id: str, timestamp: float, violation: Dict) -> Dict:
+        """Convert a violation into a nudge for display"""
+        return {
+            "nudge_id": f"{session_id}_{timestamp}_{violation['rule_id']}",
+            "rule_id": violation["rule_id"],
+            "timestamp": timestamp,
+            "severity": violation["severity"],
+            "icon": self._get_icon(violation["severity"]),
+            "title": violation["rule_name"],
+            "message": violation["message"],
+            "suggested_response": violation.get("suggested_response"),
+            "regulation_reference": violation.get("regulation_reference"),
+        }
     
     def _get_icon(self, severity: str) -> str:
         """Get icon for severity"""
@@ -3,11 +3,62 @@ Compliance Engine - Core Compliance Checking Logic
 Detects violations in real-time and provides guidance
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
+import bisect
+from concurrent.futures import ProcessPoolExecutor
 from loguru import logger
 from datetime import datetime
 import re
+import os
 import asyncio
+import itertools
+import threading
+import time
+
+from config import settings
+from services.rule_compiler import (
+    CompiledPattern,
+    compile_pattern,
+    windowed_search,
+    RISK_LINEAR,
+    RISK_POLYNOMIAL,
+)
+from services.rule_matcher import RuleMatcher
+from services.rule_prefilter import combine_keywords
+from services.result_cache import ResultCache, normalize_text, normalize_with_offsets
+from services.transcript_stream import TranscriptStream
+
+
+# Rule set owned by each batch worker process
+_worker_ruleset: Optional["RuleSet"] = None
+
+
+def _init_batch_worker(rules: List["ComplianceRule"]):
+    """Build the rule set and its matchers once per batch worker process"""
+    global _worker_ruleset
+    _worker_ruleset = RuleSet(rules)
+
+
+def _match_batch_chunk(
+    texts: List[str],
+    budget_seconds: float,
+    product: Optional[str] = None,
+) -> List[Tuple[List[int], bool]]:
+    """Return the indexes of the rules that fire on each text, and whether all were checked"""
+    positions = {id(rule): index for index, rule in enumerate(_worker_ruleset.rules)}
+    matcher = _worker_ruleset.matcher_for(product)
+    results = []
+    for text in texts:
+        rules, complete = matcher.match_complete(text, time.perf_counter() + budget_seconds)
+        results.append(([positions[id(rule)] for rule in rules], complete))
+    return results
+
+
+def normalize_product(product: Optional[str]) -> Optional[str]:
+    """Canonical product key, e.g. "GlucoMax" -> "glucomax" """
+    if not product:
+        return None
+    return product.strip().lower() or None
 
 
 class ComplianceRule:
@@ -23,19 +74,129 @@ class ComplianceRule:
         message: str,
         suggested_response: Optional[str] = None,
         regulation_reference: Optional[str] = None,
+        compiled_patterns: Optional[List[CompiledPattern]] = None,
+        products: Optional[List[str]] = None,
     ):
         self.rule_id = rule_id
         self.name = name
         self.category = category
-        self.patterns = [re.compile(p, re.IGNORECASE) for p in patterns]
+        # Products this rule applies to; an empty list makes it a global rule
+        self.products = [normalize_product(p) for p in products or [] if normalize_product(p)]
         self.severity = severity
         self.message = message
         self.suggested_response = suggested_response
         self.regulation_reference = regulation_reference
+        
+        # Rules loaded from a cached rule pack skip the pattern analysis
+        if compiled_patterns is None:
+            compiled_patterns = [compile_pattern(p, re.IGNORECASE) for p in patterns]
+        self.compiled_patterns = compiled_patterns
+        
+        # Linear-time patterns run on the fast path, super-linear ones in bounded
+        # windows, and patterns with exponential worst cases are quarantined
+        self.fast_patterns = [c.regex for c in self.compiled_patterns if c.risk == RISK_LINEAR]
+        self.slow_patterns = [c.regex for c in self.compiled_patterns if c.risk == RISK_POLYNOMIAL]
+        self.unsafe_patterns = [
+            c.source for c in self.compiled_patterns
+            if c.risk not in (RISK_LINEAR, RISK_POLYNOMIAL)
+        ]
+        self.patterns = self.fast_patterns + self.slow_patterns
+        
+        if self.unsafe_patterns:
+            logger.error(
+                f"Rule {rule_id}: quarantined patterns with exponential backtracking: "
+                f"{self.unsafe_patterns}"
+            )
+        
+        # Words one of which must appear for any pattern to match (None = always check)
+        self.keywords = combine_keywords(
+            c.keywords for c in self.compiled_patterns
+            if c.risk in (RISK_LINEAR, RISK_POLYNOMIAL)
+        )
     
-    def check(self, text: str) -> bool:
+    def check(self, text: str, deadline: Optional[float] = None) -> bool:
         """Check if text matches this rule"""
-        return any(pattern.search(text) for pattern in self.patterns)
+        return self.check_fast(text) or self.check_slow(text, deadline)
+    
+    def check_fast(self, text: str) -> bool:
+        """Check the linear-time patterns"""
+        return any(pattern.search(text) for pattern in self.fast_patterns)
+    
+    def check_slow(self, text: str, deadline: Optional[float] = None) -> bool:
+        """Check the super-linear patterns in bounded windows"""
+        return any(windowed_search(pattern, text, deadline) for pattern in self.slow_patterns)
+    
+    def find(self, text: str, start: int = 0, deadline: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        """
+        Return the (start, end) offsets of the earliest match in text
+        Only matches ending after offset start are considered
+        Slow patterns are searched like check_slow, and give up at deadline
+        """
+        best = None
+        for pattern in self.patterns:
+            slow = pattern in self.slow_patterns
+            pos = 0
+            while pos <= len(text):
+                m = windowed_search(pattern, text, deadline, pos) if slow else pattern.search(text, pos)
+                if m is None or (best is not None and m.start() >= best[0]):
+                    break
+                if m.end() > start:
+                    best = m.span()
+                    break
+                pos = m.start() + 1
+        return best
+    
+    def matches_after(self, text: str, start: int, deadline: Optional[float] = None) -> bool:
+        """Check if any pattern has a match in text ending after offset start"""
+        return self.find(text, start, deadline) is not None
+
+
+_ruleset_versions = itertools.count(1)
+
+
+class RuleSet:
+    """
+    Immutable snapshot of the rules and their compiled matcher
+    Checks hold on to the snapshot they started with, so swapping in a new
+    rule set never affects a check that is already running
+    """
+    
+    def __init__(self, rules: List[ComplianceRule]):
+        self.rules: Tuple[ComplianceRule, ...] = tuple(rules)
+        self.matcher = RuleMatcher(list(self.rules))
+        self.version = next(_ruleset_versions)
+        
+        self.by_category: Dict[str, List[ComplianceRule]] = {}
+        self.by_product: Dict[str, List[ComplianceRule]] = {}
+        for rule in self.rules:
+            self.by_category.setdefault(rule.category, []).append(rule)
+            for product in rule.products:
+                self.by_product.setdefault(product, []).append(rule)
+        
+        # A session with a product checks the global rules plus that product's rules
+        global_rules = [rule for rule in self.rules if not rule.products]
+        if len(global_rules) == len(self.rules):
+            self.global_matcher = self.matcher
+        else:
+            self.global_matcher = RuleMatcher(global_rules, scanner=self.matcher)
+        # Product matchers reuse the full matcher's compiled scan
+        self.product_matchers: Dict[str, RuleMatcher] = {
+            product: RuleMatcher([
+                rule for rule in self.rules
+                if not rule.products or product in rule.products
+            ], scanner=self.matcher)
+            for product in self.by_product
+        }
+    
+    def matcher_for(self, product: Optional[str] = None) -> RuleMatcher:
+        """
+        Matcher for a session's product focus
+        Without a product every rule is checked; an unknown product gets the global rules
+        """
+        product = normalize_product(product)
+        if product is None:
+            return self.matcher
+        return self.product_matchers.get(product, self.global_matcher)
 
 
 class ComplianceEngine:
@@ -44,27 +205,48 @@ class ComplianceEngine:
     """
     
     def __init__(self):
-        self.rules: List[ComplianceRule] = []
+        self.ruleset = RuleSet([])
         self.initialized = False
+        self._write_lock = threading.Lock()
+        self._batch_pool: Optional[ProcessPoolExecutor] = None
+        self._batch_pool_version = 0
+        self.cache = ResultCache(settings.COMPLIANCE_RESULT_CACHE_SIZE)
+    
+    @property
+    def rules(self) -> List[ComplianceRule]:
+        """Rules in the current rule set"""
+        return list(self.ruleset.rules)
+    
+    @property
+    def matcher(self) -> RuleMatcher:
+        """Compiled matcher for the current rule set"""
+        return self.ruleset.matcher
     
     async def initialize(self):
         """Initialize compliance rules"""
         logger.info("Initializing Compliance Engine...")
         
-        # Load default rules
-        self._load_default_rules()
+        # Load default rules, then rule packs (a pack rule replaces a default with its id)
+        from services.rule_packs import load_rule_packs
+        
+        rules = {rule.rule_id: rule for rule in self._load_default_rules()}
+        for rule in await asyncio.to_thread(load_rule_packs):
+            rules[rule.rule_id] = rule
+        rules = list(rules.values())
         
         # TODO: Load custom rules from database
         # TODO: Load FDA regulations using Token Company
         
+        self.replace_rules(rules)
         self.initialized = True
         logger.success(f"Compliance Engine initialized with {len(self.rules)} rules")
     
-    def _load_default_rules(self):
+    def _load_default_rules(self) -> List[ComplianceRule]:
         """Load default compliance rules"""
+        rules = []
         
         # Off-Label Promotion Rules
-        self.rules.append(ComplianceRule(
+        rules.append(ComplianceRule(
             rule_id="off_label_001",
             name="Direct Off-Label Promotion",
             category="off_label",
@@ -80,7 +262,7 @@ class ComplianceEngine:
             regulation_reference="FDA FDCA Section 502(f)(1)",
         ))
         
-        self.rules.append(ComplianceRule(
+        rules.append(ComplianceRule(
             rule_id="off_label_002",
             name="Implied Off-Label Use",
             category="off_label",
@@ -96,7 +278,7 @@ class ComplianceEngine:
         ))
         
         # Efficacy Exaggeration Rules
-        self.rules.append(ComplianceRule(
+        rules.append(ComplianceRule(
             rule_id="efficacy_001",
             name="Absolute Efficacy Claims",
             category="efficacy",
@@ -112,7 +294,7 @@ class ComplianceEngine:
             regulation_reference="FDA Guidance on Drug Advertising",
         ))
         
-        self.rules.append(ComplianceRule(
+        rules.append(ComplianceRule(
             rule_id="efficacy_002",
             name="Comparative Superiority without Data",
             category="efficacy",
@@ -128,7 +310,7 @@ class ComplianceEngine:
         ))
         
         # Safety/Side Effect Rules
-        self.rules.append(ComplianceRule(
+        rules.append(ComplianceRule(
             rule_id="safety_001",
             name="Downplaying Side Effects",
             category="safety",
@@ -144,7 +326,7 @@ class ComplianceEngine:
         ))
         
         # Contraindication Rules
-        self.rules.append(ComplianceRule(
+        rules.append(ComplianceRule(
             rule_id="contraindication_001",
             name="Ignoring Contraindications",
             category="contraindications",
@@ -159,8 +341,53 @@ class ComplianceEngine:
             regulation_reference="FDA Prescribing Information Requirements",
         ))
         
+        # Product-Specific Rules (checked only in sessions focused on that product)
+        rules.append(ComplianceRule(
+            rule_id="glucomax_off_label_001",
+            name="GlucoMax Off-Label Use",
+            category="off_label",
+            patterns=[
+                r"(?<!not approved )(?<!not indicated )for (weight loss|PCOS|prediabetes|type 1 diabetes)",
+                r"helps? (patients |people )?(lose weight|with weight loss)",
+            ],
+            severity="critical",
+            message="🛑 GlucoMax is only approved for Type 2 Diabetes management.",
+            suggested_response="GlucoMax is indicated for adults with Type 2 Diabetes. I can walk you through that clinical data.",
+            regulation_reference="FDA FDCA Section 502(f)(1)",
+            products=["glucomax"],
+        ))
+        
+        rules.append(ComplianceRule(
+            rule_id="cardioguard_off_label_001",
+            name="CardioGuard Off-Label Use",
+            category="off_label",
+            patterns=[
+                r"(?<!not approved )(?<!not indicated )for (heart failure|atrial fibrillation|a-?fib)",
+            ],
+            severity="critical",
+            message="🛑 CardioGuard is only approved for Hypertension.",
+            suggested_response="CardioGuard is indicated for Hypertension. I can share the clinical data for that indication.",
+            regulation_reference="FDA FDCA Section 502(f)(1)",
+            products=["cardioguard"],
+        ))
+        
+        rules.append(ComplianceRule(
+            rule_id="cardioguard_contraindication_001",
+            name="CardioGuard Use in Pregnancy",
+            category="contraindications",
+            patterns=[
+                r"(safe|fine|okay) (to (use|take) )?(in|during) pregnancy",
+                r"pregnant (patients|women) can (use|take) (it|this|cardioguard)",
+            ],
+            severity="critical",
+            message="🛑 CardioGuard is not for use in pregnancy.",
+            suggested_response="CardioGuard should not be used during pregnancy. Please review the boxed warning in the prescribing information.",
+            regulation_reference="FDA Prescribing Information Requirements",
+            products=["cardioguard"],
+        ))
+        
         # Pricing/Payment Rules
-        self.rules.append(ComplianceRule(
+        rules.append(ComplianceRule(
             rule_id="pricing_001",
             name="Illegal Pricing Discussions",
             category="pricing",
@@ -176,7 +403,7 @@ class ComplianceEngine:
         ))
         
         # Confidence/Uncertainty Patterns
-        self.rules.append(ComplianceRule(
+        rules.append(ComplianceRule(
             rule_id="confidence_001",
             name="Uncertain Response",
             category="confidence",
@@ -189,15 +416,20 @@ class ComplianceEngine:
             suggested_response="Let me reference the clinical data to give you an accurate answer.",
             regulation_reference=None,
         ))
+        
+        return rules
     
     async def check_text(
         self,
         text: str,
         context: Optional[Dict] = None,
+        stop_on_critical: bool = False,
     ) -> List[Dict]:
         """
         Check text for compliance violations
         Returns list of violations found
+        A product_focus in context limits the check to global and product rules
+        With stop_on_critical, checking stops at the first critical violation
         """
         violations = []
         
@@ -205,28 +437,249 @@ class ComplianceEngine:
             logger.warning("Compliance engine not initialized")
             return violations
         
-        # Check against all rules
-        for rule in self.rules:
-            if rule.check(text):
-                violation = {
-                    "rule_id": rule.rule_id,
-                    "rule_name": rule.name,
-                    "category": rule.category,
-                    "severity": rule.severity,
-                    "message": rule.message,
-                    "suggested_response": rule.suggested_response,
-                    "regulation_reference": rule.regulation_reference,
-                    "matched_text": text,
-                    "timestamp": datetime.utcnow().isoformat(),
-                }
-                violations.append(violation)
-                
-                logger.warning(
-                    f"Violation detected: {rule.name} ({rule.severity})"
-                )
+        # Single compiled scan over the session's rules, memoized per rule set version
+        ruleset = self.ruleset
+        deadline = self._deadline()
+        for rule in self._match_cached(ruleset, text, self._product(context), stop_on_critical, deadline):
+            violations.append(self._build_violation(rule, text, deadline=deadline))
+            
+            logger.warning(
+                f"Violation detected: {rule.name} ({rule.severity})"
+            )
+        
+        return violations
+    
+    async def check_stream(
+        self,
+        stream: TranscriptStream,
+        speaker: str,
+        text: str,
+        context: Optional[Dict] = None,
+        stop_on_critical: bool = False,
+        segment_id: Optional[str] = None,
+        suppressed: Optional[Set[str]] = None,
+    ) -> List[Dict]:
+        """
+        Check the next segment of a transcript stream for compliance violations
+        Violations spanning the previous segment are caught; ones already
+        reported for earlier segments, or earlier revisions of this segment,
+        are not repeated
+        Critical rules in suppressed (not going to be nudged) are reported but
+        do not stop the check, so they cannot hide a new critical violation
+        """
+        window, boundary = stream.feed(speaker, text, segment_id)
+        if not self.initialized:
+            logger.warning("Compliance engine not initialized")
+            return []
+        
+        violations = []
+        ruleset = self.ruleset
+        matcher = ruleset.matcher_for(self._product(context))
+        deadline = self._deadline()
+        # The matcher cannot stop early here: a critical hit in the carried-over
+        # tail was already reported and must not hide one in the new text
+        # Violations report offsets into the segment the client sent
+        prefix = window[:len(window) - len(stream.segment)]
+        for rule in matcher.match(window, deadline):
+            if rule.rule_id in stream.reported or not rule.matches_after(window, boundary, deadline):
+                continue
+            stream.reported.add(rule.rule_id)
+            violations.append(self._build_violation(rule, text, deadline, prefix))
+            
+            logger.warning(
+                f"Violation detected: {rule.name} ({rule.severity})"
+            )
+            
+            if stop_on_critical and rule.severity == "critical" and rule.rule_id not in (suppressed or ()):
+                break
         
         return violations
     
+    async def check_batch(
+        self,
+        texts: List[str],
+        context: Optional[Dict] = None,
+    ) -> List[List[Dict]]:
+        """
+        Check many texts for compliance violations in one call
+        Returns one list of violations per text, in input order
+        """
+        if not self.initialized:
+            logger.warning("Compliance engine not initialized")
+            return [[] for _ in texts]
+        
+        ruleset = self.ruleset
+        product = self._product(context)
+        normalized = [normalize_text(text) for text in texts]
+        fired: List[Optional[Tuple[ComplianceRule, ...]]] = [
+            self.cache.get((ruleset.version, product, key)) for key in normalized
+        ]
+        
+        # Only the distinct texts missing from the cache are matched
+        missing = list(dict.fromkeys(key for key, rules in zip(normalized, fired) if rules is None))
+        if len(missing) >= settings.COMPLIANCE_BATCH_POOL_THRESHOLD and self._pool_workers() > 1:
+            matched = await self._match_in_pool(ruleset, missing, product)
+        else:
+            matcher = ruleset.matcher_for(product)
+            matched = [matcher.match_complete(key, self._deadline()) for key in missing]
+        
+        found = {}
+        for key, (rules, complete) in zip(missing, matched):
+            found[key] = tuple(rules)
+            if complete:
+                self.cache.put((ruleset.version, product, key), found[key])
+        fired = [rules if rules is not None else found[key] for key, rules in zip(normalized, fired)]
+        
+        results = [
+            [self._build_violation(rule, text, deadline=self._deadline()) for rule in rules]
+            for text, rules in zip(texts, fired)
+        ]
+        
+        flagged = sum(1 for violations in results if violations)
+        if flagged:
+            logger.warning(f"Violations detected in {flagged}/{len(texts)} batched texts")
+        
+        return results
+    
+    def _match_cached(
+        self,
+        ruleset: RuleSet,
+        text: str,
+        product: Optional[str] = None,
+        stop_on_critical: bool = False,
+        deadline: Optional[float] = None,
+    ) -> Tuple[ComplianceRule, ...]:
+        """Rules that fire on text, served from the result cache when possible"""
+        key = normalize_text(text)
+        rules = self.cache.get((ruleset.version, product, key))
+        if rules is not None:
+            if stop_on_critical:
+                for position, rule in enumerate(rules):
+                    if rule.severity == "critical":
+                        return rules[:position + 1]
+            return rules
+        
+        matcher = ruleset.matcher_for(product)
+        deadline = self._deadline() if deadline is None else deadline
+        matched, complete = matcher.match_complete(key, deadline, stop_on_critical)
+        rules = tuple(matched)
+        # Results cut short by the time budget would hide violations if replayed
+        if complete:
+            self.cache.put((ruleset.version, product, key), rules)
+        return rules
+    
+    def _product(self, context: Optional[Dict]) -> Optional[str]:
+        """Product focus of the session a check belongs to"""
+        return normalize_product((context or {}).get("product_focus"))
+    
+    def _budget_seconds(self) -> float:
+        return settings.COMPLIANCE_CHECK_BUDGET_MS / 1000
+    
+    def _deadline(self) -> float:
+        """Deadline for the slow path of a single check"""
+        return time.perf_counter() + self._budget_seconds()
+    
+    def _pool_workers(self) -> int:
+        """Number of worker processes for large batches"""
+        return settings.COMPLIANCE_POOL_WORKERS or os.cpu_count() or 1
+    
+    async def _match_in_pool(
+        self,
+        ruleset: RuleSet,
+        texts: List[str],
+        product: Optional[str] = None,
+    ) -> List[Tuple[List[ComplianceRule], bool]]:
+        """Spread a large batch across the worker process pool"""
+        # Workers hold a copy of the rules, so a newer rule set needs new workers
+        if self._batch_pool is None or self._batch_pool_version != ruleset.version:
+            self._shutdown_batch_pool()
+            self._batch_pool = ProcessPoolExecutor(
+                max_workers=self._pool_workers(),
+                initializer=_init_batch_worker,
+                initargs=(list(ruleset.rules),),
+            )
+            self._batch_pool_version = ruleset.version
+        pool = self._batch_pool
+        
+        # A few chunks per worker keeps the pool balanced on uneven texts
+        chunk_size = max(1, len(texts) // (self._pool_workers() * 4))
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+        
+        loop = asyncio.get_running_loop()
+        chunk_results = await asyncio.gather(*[
+            loop.run_in_executor(pool, _match_batch_chunk, chunk, self._budget_seconds(), product)
+            for chunk in chunks
+        ])
+        
+        rules = ruleset.rules
+        return [
+            ([rules[index] for index in indexes], complete)
+            for chunk_result in chunk_results
+            for indexes, complete in chunk_result
+        ]
+    
+    def _find_span(
+        self,
+        rule: ComplianceRule,
+        text: str,
+        start: int = 0,
+        deadline: Optional[float] = None,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Offsets in text of the rule's earliest match ending after start
+        Rules are matched on normalized text, so when only that matches
+        (e.g. extra spaces) the match is mapped back onto text
+        """
+        span = rule.find(text, start, deadline)
+        if span is not None:
+            return span
+        normalized, offsets = normalize_with_offsets(text)
+        span = rule.find(normalized, bisect.bisect_left(offsets, start), deadline)
+        if span is None or span[0] == span[1]:
+            return span
+        return offsets[span[0]], offsets[span[1] - 1] + 1
+    
+    def _build_violation(
+        self,
+        rule: ComplianceRule,
+        text: str,
+        deadline: Optional[float] = None,
+        prefix: str = "",
+    ) -> Dict:
+        """
+        Build the violation record for a rule that fired on text
+        Only the matched span is kept, with its offsets into text. prefix is
+        the stream text checked before text (tail and joining space); a match
+        starting there is clipped to text and marked cross_segment
+        """
+        # text is checked with surrounding whitespace stripped, as the stream stores it
+        lead = len(text) - len(text.lstrip()) if prefix else 0
+        window = prefix + text[lead:].rstrip() if prefix else text
+        base = len(prefix) - lead
+        
+        span = self._find_span(rule, window, len(prefix) - 1 if prefix else 0, deadline)
+        if span is None:
+            # The span search ran out of time; fall back to the whole segment
+            cross_segment, start, end = False, 0, len(text)
+        else:
+            cross_segment = span[0] < len(prefix)
+            start = max(span[0], len(prefix)) - base
+            end = max(span[1] - base, start)
+        return {
+            "rule_id": rule.rule_id,
+            "rule_name": rule.name,
+            "category": rule.category,
+            "severity": rule.severity,
+            "message": rule.message,
+            "suggested_response": rule.suggested_response,
+            "regulation_reference": rule.regulation_reference,
+            "matched_text": text[start:end],
+            "match_start": start,
+            "match_end": end,
+            "cross_segment": cross_segment,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+    
     async def check_transcript_segment(
         self,
         speaker: str,
@@ -244,12 +697,61 @@ class ComplianceEngine:
     
     def add_custom_rule(self, rule: ComplianceRule):
         """Add a custom compliance rule"""
-        self.rules.append(rule)
+        self.add_custom_rules([rule])
         logger.info(f"Added custom rule: {rule.rule_id}")
     
+    def add_custom_rules(self, rules: List[ComplianceRule]):
+        """Add several custom rules with a single rule set swap"""
+        with self._write_lock:
+            self._swap(RuleSet(list(self.ruleset.rules) + list(rules)))
+        logger.info(f"Added {len(rules)} custom rules")
+    
+    def replace_rules(self, rules: List[ComplianceRule]) -> int:
+        """
+        Atomically swap in a new rule set (copy-on-write)
+        The matcher is compiled before the swap, so readers never wait on it
+        Returns the new rule set version
+        """
+        ruleset = RuleSet(rules)
+        with self._write_lock:
+            self._swap(ruleset)
+        return ruleset.version
+    
+    async def reload_rules(self, rules: List[ComplianceRule]) -> int:
+        """Compile a new rule set off the event loop, then swap it in"""
+        ruleset = await asyncio.to_thread(RuleSet, rules)
+        with self._write_lock:
+            self._swap(ruleset)
+        logger.info(f"Reloaded compliance rules: {len(ruleset.rules)} rules (v{ruleset.version})")
+        return ruleset.version
+    
+    def _swap(self, ruleset: RuleSet):
+        # A single reference assignment: readers see the old or the new set, never a mix
+        self.ruleset = ruleset
+        # Entries are keyed by version, so the old ones can no longer be hit
+        self.cache.clear()
+    
+    def _shutdown_batch_pool(self):
+        if self._batch_pool is not None:
+            # In-flight batches on the old pool are left to finish
+            self._batch_pool.shutdown(wait=False)
+            self._batch_pool = None
+    
+    def cache_stats(self) -> Dict:
+        """Result cache hit and miss counters"""
+        return self.cache.stats()
+    
+    def shutdown(self):
+        """Release the batch worker processes"""
+        self._shutdown_batch_pool()
+    
     def get_rules_by_category(self, category: str) -> List[ComplianceRule]:
         """Get all rules for a specific category"""
-        return [rule for rule in self.rules if rule.category == category]
+        return list(self.ruleset.by_category.get(category, []))
+    
+    def get_rules_by_product(self, product: str) -> List[ComplianceRule]:
+        """Get the rules scoped to a specific product"""
+        return list(self.ruleset.by_product.get(normalize_product(product), []))
     
     async def generate_coaching_tip(
         self,
@@ -2,12 +2,13 @@
 Copilot Service - Manages live copilot sessions
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 from loguru import logger
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 
 from config import settings
+from services.backplane import backplane
 
 
 class CopilotService:
@@ -48,8 +49,27 @@ class CopilotService:
         self.sessions[session_id] = session
         logger.info(f"Created copilot session: {session_id}")
         
+        await self._publish({
+            "type": "session_started",
+            "session": {**session, "started_at": session["started_at"].isoformat()},
+        })
+        
         return session
     
+    def pending_session_count(self, connected: Set[str]) -> int:
+        """
+        Sessions started within ADMISSION_CONNECT_GRACE_SECONDS whose socket
+        has not connected yet; sessions abandoned before connecting stop
+        counting once the grace period is over
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.ADMISSION_CONNECT_GRACE_SECONDS)
+        return sum(
+            1 for session_id, session in self.sessions.items()
+            if session["status"] == "active"
+            and session["started_at"] > cutoff
+            and session_id not in connected
+        )
+    
     async def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session details"""
         return self.sessions.get(session_id)
@@ -70,6 +90,12 @@ class CopilotService:
         # Clean up session data (privacy)
         await self._cleanup_session_data(session_id)
         
+        await self._publish({
+            "type": "session_stopped",
+            "session_id": session_id,
+            "ended_at": session["ended_at"].isoformat(),
+        })
+        
         logger.info(f"Copilot session stopped: {session_id}")
         
         return {
@@ -85,12 +111,61 @@ class CopilotService:
         
         return self.sessions[session_id].get("nudges", [])
     
+    async def get_compliance_context(self, session_id: str) -> Dict:
+        """
+        Context for compliance checks in a session
+        A product_focus set through update_context overrides the starting one
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return {}
+        
+        return {"product_focus": session["product_focus"], **session["context"]}
+    
     async def update_context(self, session_id: str, context: Dict):
         """Update session context"""
         
         if session_id in self.sessions:
             self.sessions[session_id]["context"].update(context)
             logger.debug(f"Updated context for session {session_id}")
+            await self._publish({
+                "type": "context_updated",
+                "session_id": session_id,
+                "context": context,
+            })
+    
+    async def apply_event(self, event: Dict):
+        """
+        Apply a session change made on another worker
+        Every worker keeps a replica, so REST calls and sockets agree on state
+        """
+        event_type = event.get("type")
+        
+        if event_type == "session_started":
+            session = dict(event["session"])
+            session["started_at"] = datetime.fromisoformat(session["started_at"])
+            self.sessions[session["session_id"]] = session
+        
+        elif event_type == "context_updated":
+            if event["session_id"] in self.sessions:
+                self.sessions[event["session_id"]]["context"].update(event["context"])
+        
+        elif event_type == "session_stopped":
+            session = self.sessions.get(event["session_id"])
+            if session is not None:
+                session["status"] = "completed"
+                session["ended_at"] = datetime.fromisoformat(event["ended_at"])
+                await self._cleanup_session_data(event["session_id"])
+        
+        else:
+            logger.warning(f"Unknown session event: {event_type}")
+    
+    async def _publish(self, event: Dict):
+        """Replicate a session change to the other workers"""
+        try:
+            await backplane.publish_event(event)
+        except Exception as e:
+            logger.error(f"Error publishing session event {event['type']}: {e}")
     
     async def _trigger_analytics(self, session: Dict) -> str:
         """Trigger analytics generation for completed session"""
@@ -111,6 +186,10 @@ class CopilotService:
             logger.info(f"Cleaned up session data for {session_id} (privacy)")
 
 
+# Global instance
+copilot_service = CopilotService()
+
+
 class AudioProcessor:
     """
     Processes audio for transcription
@@ -0,0 +1,118 @@
+"""
+Endpointer - Groups VAD-gated audio frames into utterances
+Emits partial hypotheses while the rep is talking and a final one at end of speech
+"""
+
+from typing import List, Optional
+import numpy as np
+
+from config import settings
+
+
+class Utterance:
+    """Audio to transcribe for one partial or final hypothesis"""
+    
+    __slots__ = ("segment_id", "samples", "is_final", "timestamp", "speaker")
+    
+    def __init__(self, segment_id: str, samples: np.ndarray, is_final: bool, timestamp: float, speaker: str):
+        self.segment_id = segment_id
+        self.samples = samples
+        self.is_final = is_final
+        self.timestamp = timestamp
+        self.speaker = speaker
+
+
+class Endpointer:
+    """
+    Per-session utterance segmentation over (frame, voiced, padded) frames
+    
+    An utterance opens on the first voiced frame and ends after
+    ENDPOINT_SILENCE_MS of unvoiced frames (on top of the VAD padding), or is
+    cut at ENDPOINT_MAX_UTTERANCE_MS. Every ENDPOINT_PARTIAL_INTERVAL_MS of
+    speech a partial covering the utterance so far is emitted. Partials and
+    the final share a segment_id, so downstream they revise one segment.
+    Unvoiced frames are never added to an utterance. Utterances with less
+    than ENDPOINT_MIN_SPEECH_MS of speech are dropped; padded frames (VAD
+    hangover after speech) are kept but do not count as speech.
+    """
+    
+    def __init__(self, prefix: str, speaker: str = "rep"):
+        frame_ms = settings.AUDIO_VAD_FRAME_MS
+        self.prefix = prefix
+        self.speaker = speaker
+        self.silence_frames = max(1, settings.ENDPOINT_SILENCE_MS // frame_ms)
+        self.partial_frames = max(1, settings.ENDPOINT_PARTIAL_INTERVAL_MS // frame_ms)
+        self.max_frames = max(1, settings.ENDPOINT_MAX_UTTERANCE_MS // frame_ms)
+        self.min_frames = settings.ENDPOINT_MIN_SPEECH_MS // frame_ms
+        self.utterances = 0
+        self._reset()
+    
+    def _reset(self):
+        self._frames: List[np.ndarray] = []
+        self._speech_frames = 0
+        self._silent_run = 0
+        self._since_partial = 0
+        self._started_at = 0.0
+        self._speaker = self.speaker
+    
+    @property
+    def segment_id(self) -> str:
+        """Id of the utterance in progress (or the next one)"""
+        return f"{self.prefix}-u{self.utterances}"
+    
+    def push(
+        self,
+        frame: np.ndarray,
+        voiced: bool,
+        timestamp: float,
+        speaker: Optional[str] = None,
+        padded: bool = False,
+    ) -> Optional[Utterance]:
+        """
+        Add one VAD frame; returns a partial or final utterance when one is due
+        An utterance is tagged with the speaker attributed to its first frame
+        """
+        if voiced:
+            if not self._frames:
+                self._started_at = timestamp
+                self._speaker = speaker or self.speaker
+            self._frames.append(frame)
+            self._speech_frames += not padded
+            self._silent_run = 0
+            self._since_partial += 1
+            if len(self._frames) >= self.max_frames:
+                return self._finish()
+            if self._since_partial >= self.partial_frames:
+                self._since_partial = 0
+                return self._utterance(is_final=False)
+            return None
+        
+        if not self._frames:
+            return None
+        self._silent_run += 1
+        if self._silent_run >= self.silence_frames:
+            return self._finish()
+        return None
+    
+    def flush(self) -> Optional[Utterance]:
+        """End the utterance in progress, e.g. when the client stops streaming"""
+        if not self._frames:
+            return None
+        return self._finish()
+    
+    def _finish(self) -> Optional[Utterance]:
+        # Clicks and coughs too short to be speech are dropped
+        utterance = self._utterance(is_final=True) if self._speech_frames >= self.min_frames else None
+        if utterance is not None:
+            self.utterances += 1
+        self._reset()
+        return utterance
+    
+    def _utterance(self, is_final: bool) -> Utterance:
+        return Utterance(
+            segment_id=self.segment_id,
+            samples=np.concatenate(self._frames),
+            is_final=is_final,
+            timestamp=self._started_at,
+            speaker=self._speaker,
+        )
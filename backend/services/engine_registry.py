@@ -0,0 +1,55 @@
+"""
+Compliance Engine Registry - Process-wide shared compliance engine
+The REST API, WebSocket manager and compliance checker all use one engine
+"""
+
+from typing import List, Optional
+from loguru import logger
+import asyncio
+
+from services.compliance_engine import ComplianceEngine, ComplianceRule
+
+
+class ComplianceEngineRegistry:
+    """
+    Owns the single, initialized compliance engine for this process
+    Rule reloads are copy-on-write swaps on that engine, so readers never lock
+    """
+    
+    def __init__(self):
+        self._engine: Optional[ComplianceEngine] = None
+        self._init_lock: Optional[asyncio.Lock] = None
+    
+    async def get_engine(self) -> ComplianceEngine:
+        """Return the shared engine, initializing it on first use"""
+        if self._engine is not None:
+            return self._engine
+        
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        
+        async with self._init_lock:
+            if self._engine is None:
+                engine = ComplianceEngine()
+                await engine.initialize()
+                self._engine = engine
+                logger.info("Shared compliance engine ready")
+        
+        return self._engine
+    
+    async def reload_rules(self, rules: List[ComplianceRule]) -> int:
+        """
+        Swap a new rule set into the shared engine
+        Checks already running finish against the rule set they started with
+        """
+        engine = await self.get_engine()
+        return await engine.reload_rules(rules)
+    
+    def shutdown(self):
+        """Release resources held by the shared engine"""
+        if self._engine is not None:
+            self._engine.shutdown()
+
+
+# Global instance
+compliance_registry = ComplianceEngineRegistry()
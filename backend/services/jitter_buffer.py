@@ -0,0 +1,155 @@
+"""
+Jitter Buffer - Puts incoming audio chunks back in order before processing
+Mobile links deliver chunks late, out of order or twice
+"""
+
+from typing import Dict, List, Optional, Tuple
+import heapq
+import time
+
+from config import settings
+from services.audio_processor import AudioData
+
+
+class _Chunk:
+    __slots__ = ("key", "timestamp", "audio", "arrived_at")
+    
+    def __init__(self, key: float, timestamp: float, audio: AudioData, arrived_at: float):
+        self.key = key
+        self.timestamp = timestamp
+        self.audio = audio
+        self.arrived_at = arrived_at
+
+
+class JitterBuffer:
+    """
+    Bounded per-session reorder buffer for audio chunks
+    
+    Chunks are ordered by sequence number, or by timestamp when the client's
+    first chunk has none. The next expected chunk is released as soon as it
+    arrives; chunks behind a gap wait up to AUDIO_JITTER_TARGET_MS (or until
+    AUDIO_JITTER_MAX_CHUNKS are held) for the missing one. A gap that is
+    still open by then is filled with silence when it is at most
+    AUDIO_JITTER_MAX_GAP_MS long, so VAD and endpointing timing stay intact,
+    and skipped otherwise. Duplicates and chunks behind the playout point are
+    dropped.
+    
+    Chunks are held as received (binary frames arrive as memoryviews over
+    immutable bytes), so reordering never copies audio.
+    """
+    
+    def __init__(self, input_rate: Optional[int] = None, channels: int = 1):
+        self.target = settings.AUDIO_JITTER_TARGET_MS / 1000
+        self.max_chunks = settings.AUDIO_JITTER_MAX_CHUNKS
+        self.max_gap = settings.AUDIO_JITTER_MAX_GAP_MS / 1000
+        
+        self.reordered = 0
+        self.duplicates = 0
+        self.late = 0
+        self.gaps_filled = 0
+        self.gaps_skipped = 0
+        self.configure(input_rate or settings.AUDIO_SAMPLE_RATE, channels)
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "reordered": self.reordered,
+            "duplicate": self.duplicates,
+            "late": self.late,
+            "gap_filled": self.gaps_filled,
+            "gap_skipped": self.gaps_skipped,
+        }
+    
+    def configure(self, input_rate: int, channels: int = 1):
+        """Set the client's capture format, dropping any held chunks"""
+        self.frame_bytes = 2 * channels
+        self.bytes_per_second = input_rate * self.frame_bytes
+        self._pending: Dict[float, _Chunk] = {}
+        self._heap: List[float] = []
+        self._by_sequence: Optional[bool] = None
+        self._next: Optional[float] = None
+        self._highest = float("-inf")
+        self._next_timestamp = 0.0
+        self._chunk_seconds = 0.0
+    
+    def push(
+        self,
+        audio: AudioData,
+        timestamp: float,
+        sequence: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> List[Tuple[float, AudioData]]:
+        """
+        Add a chunk; returns the (timestamp, audio) chunks now ready, in order
+        A gap is only resolved when a later chunk arrives, or on drain()
+        """
+        now = time.monotonic() if now is None else now
+        if self._by_sequence is None:
+            self._by_sequence = sequence is not None
+        key = float(sequence) if self._by_sequence and sequence is not None else float(timestamp)
+        
+        if self._next is not None and key < self._next - self._tolerance():
+            self.late += 1
+            return []
+        if key in self._pending:
+            self.duplicates += 1
+            return []
+        if key < self._highest:
+            self.reordered += 1
+        self._highest = max(self._highest, key)
+        
+        self._pending[key] = _Chunk(key, timestamp, audio, now)
+        heapq.heappush(self._heap, key)
+        return self._release(now, flush=False)
+    
+    def drain(self) -> List[Tuple[float, AudioData]]:
+        """Release everything held, e.g. when the client stops streaming"""
+        return self._release(time.monotonic(), flush=True)
+    
+    def _tolerance(self) -> float:
+        # Client clocks jitter, so timestamps within half a chunk count as contiguous
+        return 0.5 if self._by_sequence else self._chunk_seconds / 2
+    
+    def _release(self, now: float, flush: bool) -> List[Tuple[float, AudioData]]:
+        released = []
+        while self._heap:
+            head = self._pending[self._heap[0]]
+            if self._next is not None and head.key <= self._next + self._tolerance():
+                released.append(self._pop())
+                continue
+            if self._next is None and self._by_sequence and head.key == 0:
+                # The start of the stream needs no wait
+                released.append(self._pop())
+                continue
+            
+            # A gap (or the very first chunk): wait for stragglers up to the target
+            waited = now - min(chunk.arrived_at for chunk in self._pending.values())
+            if not (flush or waited >= self.target or len(self._pending) > self.max_chunks):
+                break
+            if self._next is not None:
+                gap = self._gap_seconds(head)
+                if gap <= self.max_gap:
+                    self.gaps_filled += 1
+                    released.append((self._next_timestamp, self._silence(gap)))
+                else:
+                    self.gaps_skipped += 1
+            released.append(self._pop())
+        return released
+    
+    def _pop(self) -> Tuple[float, AudioData]:
+        chunk = self._pending.pop(heapq.heappop(self._heap))
+        self._chunk_seconds = len(chunk.audio) / self.bytes_per_second
+        self._next_timestamp = chunk.timestamp + self._chunk_seconds
+        self._next = chunk.key + 1 if self._by_sequence else self._next_timestamp
+        return chunk.timestamp, chunk.audio
+    
+    def _gap_seconds(self, head: _Chunk) -> float:
+        if self._by_sequence:
+            return (head.key - self._next) * self._chunk_seconds
+        return head.key - self._next
+    
+    def _silence(self, seconds: float) -> bytes:
+        frames = int(round(seconds * self.bytes_per_second / self.frame_bytes))
+        return bytes(frames * self.frame_bytes)
@@ -0,0 +1,223 @@
+"""
+Metrics - Low-overhead counters and latency histograms
+Rendered in the Prometheus text exposition format at /metrics
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+import os
+import sys
+import threading
+
+
+# Latency buckets in seconds, from sub-millisecond matching to slow sends
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *labelvalues: str, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+    
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_format(value)}" for labels, value in values]
+
+
+class Gauge:
+    """
+    Value read from a callback at scrape time, so updating it costs nothing
+    kind="counter" exposes a running total kept elsewhere (e.g. cache hits)
+    """
+    
+    def __init__(self, name: str, help: str, read: Callable[[], float], kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.kind = kind
+    
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format(self.read())}"]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram
+    observe() is a bisect and two increments, cheap enough for every segment
+    """
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+    
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format(total)}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+def resident_memory_bytes() -> int:
+    """Current resident set size, or the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MetricsRegistry:
+    """Every metric this process exposes, in registration order"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+    
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+    
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, buckets))
+    
+    def gauge(self, name: str, help: str, read: Callable[[], float], kind: str = "gauge") -> Gauge:
+        return self.register(Gauge(name, help, read, kind))
+    
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Global instance
+metrics = MetricsRegistry()
+
+metrics.gauge(
+    "process_resident_memory_bytes",
+    "Resident memory of this worker process",
+    resident_memory_bytes,
+)
+
+# Nudge pipeline stages, from a transcript frame arriving to its nudge being sent
+transcript_queue_seconds = metrics.histogram(
+    "veritas_transcript_queue_seconds",
+    "Time transcripts wait in the session queue before checking",
+)
+compliance_check_seconds = metrics.histogram(
+    "veritas_compliance_check_seconds",
+    "Time spent in the compliance check for a transcript segment",
+)
+nudge_send_seconds = metrics.histogram(
+    "veritas_nudge_send_seconds",
+    "Time to hand a nudges frame to the client socket",
+)
+transcription_seconds = metrics.histogram(
+    "veritas_transcription_seconds",
+    "Time to transcribe one utterance, including the worker round trip",
+)
+nudge_latency_seconds = metrics.histogram(
+    "veritas_nudge_latency_seconds",
+    "End-to-end time from transcript received to nudges sent",
+)
+
+violations_total = metrics.counter(
+    "veritas_violations_total",
+    "Compliance violations detected in live sessions",
+    ["rule_id", "severity"],
+)
+nudges_total = metrics.counter(
+    "veritas_nudges_total",
+    "Nudges sent to clients after suppression",
+    ["severity"],
+)
+transcripts_total = metrics.counter(
+    "veritas_transcripts_total",
+    "Transcript segments by outcome",
+    ["outcome"],
+)
+audio_frames_total = metrics.counter(
+    "veritas_audio_frames_total",
+    "VAD frames by outcome; only rep speech frames go on to transcription",
+    ["vad"],
+)
+audio_chunks_total = metrics.counter(
+    "veritas_audio_chunks_total",
+    "Audio chunks the jitter buffer reordered, dropped or worked around",
+    ["outcome"],
+)
+sessions_reaped_total = metrics.counter(
+    "veritas_sessions_reaped_total",
+    "WebSocket sessions closed by the reaper",
+    ["reason"],
+)
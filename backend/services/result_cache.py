@@ -0,0 +1,94 @@
+"""
+Result Cache - Bounded LRU memo of compliance check results
+Reps repeat approved talk tracks, so the same segments are checked many times
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple, TYPE_CHECKING
+import re
+import threading
+
+if TYPE_CHECKING:
+    from services.compliance_engine import ComplianceRule
+
+
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"\S+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a segment for cache lookup and matching
+    Rules match case-insensitively, so case and spacing do not change the result
+    """
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def normalize_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """
+    normalize_text(text), plus the offset in text of each normalized character
+    Lets a match found on the normalized text be reported on the original
+    """
+    parts: List[str] = []
+    offsets: List[int] = []
+    for m in _WORD.finditer(text):
+        if parts:
+            parts.append(" ")
+            offsets.append(m.start() - 1)
+        word = m.group().lower()
+        parts.append(word)
+        # Lower-casing can change a word's length; keep offsets inside the word
+        offsets.extend(m.start() + min(k, m.end() - m.start() - 1) for k in range(len(word)))
+    return "".join(parts), offsets
+
+
+class ResultCache:
+    """
+    Least-recently-used cache from (rule set version, normalized text) to the
+    rules that fired. Violations are rebuilt from the rules on every hit, so
+    cached entries never carry stale timestamps or matched text.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[ComplianceRule, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Tuple["ComplianceRule", ...]]:
+        """Return the cached rules for key, or None on a miss"""
+        with self._lock:
+            rules = self._entries.get(key)
+            if rules is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return rules
+    
+    def put(self, key: Hashable, rules: Tuple["ComplianceRule", ...]):
+        """Store the rules that fired for key, evicting the oldest entries"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = rules
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every entry, keeping the counters"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        """Hit and miss counters for sizing the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
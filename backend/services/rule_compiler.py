@@ -0,0 +1,584 @@
+"""
+Rule Compiler - Backtracking safety analysis for compliance rule patterns
+Rewrites what it safely can, classifies the rest, and bounds slow patterns
+"""
+
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from loguru import logger
+import functools
+import re
+import sys
+import time
+
+from services.rule_prefilter import extract_keywords
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse, sre_constants
+
+
+# Worst-case classes, from cheapest to most dangerous
+RISK_LINEAR = "linear"
+RISK_POLYNOMIAL = "polynomial"
+RISK_EXPONENTIAL = "exponential"
+
+# Slow patterns only ever see windows this long, so each search is bounded
+SLOW_PATH_WINDOW_CHARS = 512
+SLOW_PATH_WINDOW_OVERLAP = 128
+
+# Character classes wider than this are treated as "any character"
+MAX_CHARSET = 64
+
+# Possessive quantifiers arrived in Python 3.11
+SUPPORTS_POSSESSIVE = sys.version_info >= (3, 11)
+
+_MAXREPEAT = sre_constants.MAXREPEAT
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if SUPPORTS_POSSESSIVE:
+    _REPEATS.add(sre_constants.POSSESSIVE_REPEAT)
+
+_FLAG_LETTERS = [
+    (re.IGNORECASE, "i"),
+    (re.MULTILINE, "m"),
+    (re.DOTALL, "s"),
+    (re.VERBOSE, "x"),
+    (re.ASCII, "a"),
+]
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: r"\d",
+    sre_constants.CATEGORY_NOT_DIGIT: r"\D",
+    sre_constants.CATEGORY_SPACE: r"\s",
+    sre_constants.CATEGORY_NOT_SPACE: r"\S",
+    sre_constants.CATEGORY_WORD: r"\w",
+    sre_constants.CATEGORY_NOT_WORD: r"\W",
+}
+
+_ANCHORS = {
+    sre_constants.AT_BEGINNING: "^",
+    sre_constants.AT_BEGINNING_STRING: r"\A",
+    sre_constants.AT_BOUNDARY: r"\b",
+    sre_constants.AT_NON_BOUNDARY: r"\B",
+    sre_constants.AT_END: "$",
+    sre_constants.AT_END_STRING: r"\Z",
+}
+
+
+def _first_chars(items) -> Optional[Tuple[Set[str], bool]]:
+    """
+    Walk a parsed pattern and collect the characters a match can start with
+    Returns (chars, nullable), or None when the first character is unconstrained
+    """
+    chars: Set[str] = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            chars.add(chr(av).lower())
+            return chars, False
+        if op is sre_constants.IN:
+            for item_op, item_av in av:
+                if item_op is sre_constants.LITERAL:
+                    chars.add(chr(item_av).lower())
+                elif item_op is sre_constants.RANGE and item_av[1] - item_av[0] < MAX_CHARSET:
+                    chars.update(chr(c).lower() for c in range(item_av[0], item_av[1] + 1))
+                else:
+                    return None
+            return chars, False
+        if op is sre_constants.SUBPATTERN:
+            branches = [av[-1]]
+        elif op is sre_constants.BRANCH:
+            branches = av[1]
+        elif op in _REPEATS:
+            branches = [av[2]]
+        elif op is sre_constants.AT:
+            continue
+        else:
+            return None
+        
+        nullable = op in _REPEATS and av[0] == 0
+        for branch in branches:
+            first = _first_chars(branch)
+            if first is None:
+                return None
+            chars |= first[0]
+            nullable |= first[1]
+        if not nullable:
+            return chars, False
+    return chars, True
+
+
+def first_chars(source: str, flags: int) -> Optional[Set[str]]:
+    """Lower-cased characters every match of source must start with, if known"""
+    try:
+        first = _first_chars(sre_parse.parse(source, flags))
+    except Exception:
+        return None
+    if first is None or first[1] or len(first[0]) > MAX_CHARSET:
+        return None
+    return first[0]
+
+
+# --- Possessive rewrite -----------------------------------------------------
+
+# Marker for "the pattern may end here" in follow sets
+_END = ""
+
+
+def _follow(items, follow: Optional[Set[str]]) -> Optional[Set[str]]:
+    """First characters of items, falling through to follow when items can be empty"""
+    if follow is None:
+        return None
+    first = _first_chars(items)
+    if first is None:
+        return None
+    chars, nullable = first
+    return chars | follow if nullable else chars
+
+
+def _is_single_char(body) -> bool:
+    return len(body) == 1 and body[0][0] in (
+        sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY, sre_constants.IN,
+    )
+
+
+def _single_char_set(body) -> Optional[Set[str]]:
+    """Characters matched by a repeat body that is exactly one literal or class"""
+    if len(body) != 1 or body[0][0] not in (sre_constants.LITERAL, sre_constants.IN):
+        return None
+    first = _first_chars(body)
+    return first[0] if first is not None else None
+
+
+def _make_possessive(items, follow: Optional[Set[str]]) -> int:
+    """
+    Turn greedy single-character repeats into possessive ones wherever the
+    next character can never be one the repeat could have consumed. Giving
+    characters back could then never help the rest of the pattern match, so
+    the rewrite keeps the same matches while removing the backtracking.
+    Returns the number of repeats rewritten; items are modified in place.
+    """
+    rewritten = 0
+    for index in range(len(items) - 1, -1, -1):
+        op, av = items[index]
+        after = _follow(items[index + 1:], follow)
+        
+        if op in _REPEATS:
+            low, high, body = av
+            chars = _single_char_set(body)
+            if (
+                op is sre_constants.MAX_REPEAT
+                and high == _MAXREPEAT
+                and chars is not None
+                and after is not None
+                and not chars & after
+            ):
+                items[index] = (sre_constants.POSSESSIVE_REPEAT, av)
+                rewritten += 1
+                continue
+            
+            # The body is followed by another iteration or by whatever follows the repeat
+            again = _follow(body, after)
+            rewritten += _make_possessive(body, again | after if again is not None else None)
+        elif op is sre_constants.SUBPATTERN:
+            rewritten += _make_possessive(av[-1], after)
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                rewritten += _make_possessive(branch, after)
+    return rewritten
+
+
+# --- Unparsing --------------------------------------------------------------
+
+class _Unsupported(Exception):
+    pass
+
+
+def _flag_letters(flags: int) -> str:
+    return "".join(letter for flag, letter in _FLAG_LETTERS if flags & flag)
+
+
+def _quantifier(low: int, high: int) -> str:
+    if high == _MAXREPEAT:
+        return {0: "*", 1: "+"}.get(low, f"{{{low},}}")
+    if (low, high) == (0, 1):
+        return "?"
+    if low == high:
+        return f"{{{low}}}"
+    return f"{{{low},{high}}}"
+
+
+def _unparse_class(items) -> str:
+    parts = []
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            parts.insert(0, "^")
+        elif op is sre_constants.LITERAL:
+            parts.append(re.escape(chr(av)))
+        elif op is sre_constants.RANGE:
+            parts.append(f"{re.escape(chr(av[0]))}-{re.escape(chr(av[1]))}")
+        elif op is sre_constants.CATEGORY and av in _CATEGORIES:
+            parts.append(_CATEGORIES[av])
+        else:
+            raise _Unsupported(op)
+    return f"[{''.join(parts)}]"
+
+
+def _unparse_body(items, names) -> str:
+    """Unparse the body of a group, where a lone alternation needs no extra group"""
+    if len(items) == 1 and items[0][0] is sre_constants.BRANCH:
+        return "|".join(_unparse(branch, names) for branch in items[0][1][1])
+    return _unparse(items, names)
+
+
+def _unparse(items, names) -> str:
+    out = []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            out.append(re.escape(chr(av)))
+        elif op is sre_constants.NOT_LITERAL:
+            out.append(f"[^{re.escape(chr(av))}]")
+        elif op is sre_constants.ANY:
+            out.append(".")
+        elif op is sre_constants.IN:
+            out.append(_unparse_class(av))
+        elif op is sre_constants.AT and av in _ANCHORS:
+            out.append(_ANCHORS[av])
+        elif op is sre_constants.BRANCH:
+            out.append(f"(?:{'|'.join(_unparse(branch, names) for branch in av[1])})")
+        elif op is sre_constants.SUBPATTERN:
+            group, add_flags, del_flags, body = av
+            inner = _unparse_body(body, names)
+            if group is None:
+                flags = _flag_letters(add_flags)
+                if del_flags:
+                    flags += "-" + _flag_letters(del_flags)
+                out.append(f"(?{flags}:{inner})")
+            elif group in names:
+                out.append(f"(?P<{names[group]}>{inner})")
+            else:
+                out.append(f"({inner})")
+        elif op in _REPEATS:
+            low, high, body = av
+            inner = _unparse(body, names)
+            if not (len(body) == 1 and body[0][0] in (
+                sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY,
+                sre_constants.IN, sre_constants.SUBPATTERN,
+            )):
+                inner = f"(?:{inner})"
+            suffix = {sre_constants.MIN_REPEAT: "?"}.get(op, "")
+            if SUPPORTS_POSSESSIVE and op is sre_constants.POSSESSIVE_REPEAT:
+                suffix = "+"
+            out.append(inner + _quantifier(low, high) + suffix)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            direction, body = av
+            kind = {
+                (sre_constants.ASSERT, 1): "?=",
+                (sre_constants.ASSERT_NOT, 1): "?!",
+                (sre_constants.ASSERT, -1): "?<=",
+                (sre_constants.ASSERT_NOT, -1): "?<!",
+            }[(op, direction)]
+            out.append(f"({kind}{_unparse_body(body, names)})")
+        elif op is sre_constants.GROUPREF:
+            out.append(f"(?P={names[av]})" if av in names else f"(?:\\{av})")
+        else:
+            raise _Unsupported(op)
+    return "".join(out)
+
+
+# --- Risk analysis ----------------------------------------------------------
+
+def _is_unbounded(op, av) -> bool:
+    return op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[1] == _MAXREPEAT
+
+
+def _contains_unbounded(items) -> bool:
+    for op, av in items:
+        if _is_unbounded(op, av):
+            return True
+        for child in _children(op, av):
+            if _contains_unbounded(child):
+                return True
+    return False
+
+
+def _children(op, av):
+    if op is sre_constants.SUBPATTERN:
+        return [av[-1]]
+    if op is sre_constants.BRANCH:
+        return av[1]
+    if op in _REPEATS:
+        return [av[2]]
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    if op is sre_constants.GROUPREF_EXISTS:
+        return [branch for branch in av[1:] if branch is not None]
+    if hasattr(sre_constants, "ATOMIC_GROUP") and op is sre_constants.ATOMIC_GROUP:
+        return [av]
+    return []
+
+
+def _branches_overlap(first, second, follow: Optional[Set[str]]) -> bool:
+    """
+    Whether two alternatives can match the same text or each other's
+    prefixes: they are walked in step while both start with a literal or
+    class, then compared on their next characters (or on follow once one
+    runs out)
+    """
+    while first and second:
+        if first[0][0] is sre_constants.AT:
+            first = first[1:]
+            continue
+        if second[0][0] is sre_constants.AT:
+            second = second[1:]
+            continue
+        if not (_is_single_char(first[:1]) and _is_single_char(second[:1])):
+            break
+        first_chars, second_chars = _single_char_set(first[:1]), _single_char_set(second[:1])
+        if first_chars is not None and second_chars is not None and not first_chars & second_chars:
+            return False
+        first, second = first[1:], second[1:]
+    
+    first_chars, second_chars = _follow(first, follow), _follow(second, follow)
+    return first_chars is None or second_chars is None or bool(first_chars & second_chars)
+
+
+def _ambiguous_branch(items, follow: Optional[Set[str]]) -> bool:
+    """
+    Whether a repeat body holds an alternation two of whose branches can
+    match the same text, once each is continued by what follows it (the
+    next iteration included). The parser factors out common prefixes, so
+    (a|aa) arrives as a(|a): the empty branch is continued by the next "a"
+    """
+    for index, (op, av) in enumerate(items):
+        after = _follow(items[index + 1:], follow)
+        if op is sre_constants.BRANCH:
+            branches = av[1]
+            if any(
+                _branches_overlap(first, second, after)
+                for i, first in enumerate(branches) for second in branches[i + 1:]
+            ):
+                return True
+            if any(_ambiguous_branch(branch, after) for branch in branches):
+                return True
+        elif op is sre_constants.SUBPATTERN:
+            if _ambiguous_branch(av[-1], after):
+                return True
+        elif op in _REPEATS:
+            body = av[2]
+            again = _follow(body, after)
+            if _ambiguous_branch(body, again | after if again is not None else None):
+                return True
+    return False
+
+
+def _risks(items, reasons: List[str], in_lookaround: bool = False, leading: bool = True):
+    """Collect reasons a pattern can backtrack super-linearly"""
+    previous_unbounded = None
+    for op, av in items:
+        if _is_unbounded(op, av):
+            body = av[2]
+            if _contains_unbounded(body):
+                reasons.append(f"{RISK_EXPONENTIAL}: nested unbounded quantifiers")
+            # Each iteration ends where the next begins, or where the pattern goes on
+            again = _follow(body, {_END})
+            if _ambiguous_branch(body, again | {_END} if again is not None else None):
+                reasons.append(f"{RISK_EXPONENTIAL}: overlapping alternatives inside an unbounded repeat")
+            chars = _single_char_set(body)
+            if in_lookaround:
+                reasons.append(f"{RISK_POLYNOMIAL}: unbounded repeat inside a lookaround")
+            elif leading and _is_single_char(body):
+                reasons.append(f"{RISK_POLYNOMIAL}: pattern starts with an unbounded repeat")
+            elif previous_unbounded is not None and (
+                chars is None or previous_unbounded is True or chars & previous_unbounded
+            ):
+                reasons.append(f"{RISK_POLYNOMIAL}: adjacent overlapping unbounded repeats")
+            previous_unbounded = chars if chars is not None else True
+        elif op is not sre_constants.AT:
+            previous_unbounded = None
+        
+        lookaround = op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+        for child in _children(op, av):
+            _risks(child, reasons, in_lookaround or lookaround, leading and op is not sre_constants.LITERAL)
+        
+        if op is not sre_constants.AT and not lookaround:
+            leading = False
+
+
+def _classify(reasons: List[str]) -> str:
+    if any(reason.startswith(RISK_EXPONENTIAL) for reason in reasons):
+        return RISK_EXPONENTIAL
+    if reasons:
+        return RISK_POLYNOMIAL
+    return RISK_LINEAR
+
+
+class CompiledPattern:
+    """
+    A rule pattern after safety analysis
+    regex is compiled from the rewritten source when a rewrite applied
+    """
+    
+    def __init__(
+        self,
+        source: str,
+        compiled_source: str,
+        regex: "re.Pattern",
+        risk: str,
+        reasons: List[str],
+        keywords: Optional[FrozenSet[str]] = None,
+    ):
+        self.source = source
+        self.compiled_source = compiled_source
+        self.regex = regex
+        self.risk = risk
+        self.reasons = reasons
+        # Words one of which every match starts (None = no guarantee)
+        self.keywords = keywords
+    
+    @property
+    def rewritten(self) -> bool:
+        return self.compiled_source != self.source
+    
+    def to_dict(self) -> Dict:
+        """Serializable form of the analysis, for on-disk caches"""
+        return {
+            "source": self.source,
+            "compiled_source": self.compiled_source,
+            "flags": self.regex.flags,
+            "risk": self.risk,
+            "reasons": self.reasons,
+            "keywords": sorted(self.keywords) if self.keywords is not None else None,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CompiledPattern":
+        """Rebuild a pattern from to_dict output without re-running the analysis"""
+        keywords = data["keywords"]
+        return cls(
+            source=data["source"],
+            compiled_source=data["compiled_source"],
+            regex=re.compile(data["compiled_source"], data["flags"]),
+            risk=data["risk"],
+            reasons=list(data["reasons"]),
+            keywords=frozenset(keywords) if keywords is not None else None,
+        )
+
+
+def compile_pattern(source: str, flags: int = re.IGNORECASE) -> CompiledPattern:
+    """
+    Analyse a rule pattern, rewrite its safe greedy repeats as possessive,
+    and classify the worst-case backtracking of the result
+    """
+    regex = re.compile(source, flags)
+    parsed = sre_parse.parse(source, flags)
+    compiled_source = source
+    
+    if SUPPORTS_POSSESSIVE and _make_possessive(parsed, {_END}):
+        names = {group: name for name, group in regex.groupindex.items()}
+        try:
+            candidate = _unparse(parsed, names)
+            candidate_regex = re.compile(candidate, regex.flags)
+            if candidate_regex.groups == regex.groups:
+                compiled_source, regex = candidate, candidate_regex
+        except (_Unsupported, KeyError, re.error):
+            # Keep the original pattern and re-parse it for analysis
+            parsed = sre_parse.parse(source, flags)
+    
+    reasons: List[str] = []
+    _risks(parsed, reasons)
+    reasons = list(dict.fromkeys(reasons))
+    risk = _classify(reasons)
+    
+    if risk != RISK_LINEAR:
+        logger.debug(f"Pattern {source!r} flagged {risk}: {'; '.join(reasons)}")
+    
+    keywords = extract_keywords(compiled_source, flags)
+    return CompiledPattern(source, compiled_source, regex, risk, reasons, keywords)
+
+
+def _strip_lookarounds(items) -> int:
+    """Remove every lookaround assertion from a parsed pattern in place"""
+    removed = 0
+    for index in range(len(items) - 1, -1, -1):
+        op, av = items[index]
+        if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            del items[index]
+            removed += 1
+            continue
+        for child in _children(op, av):
+            removed += _strip_lookarounds(child)
+    return removed
+
+
+@functools.lru_cache(maxsize=None)
+def lookaround_head(regex: "re.Pattern") -> Optional[Tuple["re.Pattern", bool]]:
+    """
+    The pattern with its lookarounds removed, and whether that is linear
+    The head matches wherever the full pattern can (and more), so it finds
+    the candidate starts cheaply. None if the pattern has no lookarounds or
+    cannot be rewritten.
+    """
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+        if not _strip_lookarounds(parsed):
+            return None
+        names = {group: name for name, group in regex.groupindex.items()}
+        head = re.compile(_unparse(parsed, names), regex.flags)
+    except (_Unsupported, KeyError, re.error):
+        return None
+    
+    reasons: List[str] = []
+    _risks(parsed, reasons)
+    return head, not reasons
+
+
+def windowed_search(regex: "re.Pattern", text: str, deadline: Optional[float] = None, pos: int = 0):
+    """
+    Search text for a super-linear pattern at a bounded cost per step
+    
+    Patterns with lookarounds are only tried where their lookaround-free
+    head matches, and each try sees the rest of the text, so a negative
+    lookahead keeps its meaning however far away its phrase is. Other
+    patterns are searched in bounded, overlapping windows; matches longer
+    than the window overlap can be missed there.
+    Returns the first match found, or None if none is found before deadline.
+    """
+    head = lookaround_head(regex)
+    if head is not None:
+        return _candidate_search(regex, head[0], head[1], text, deadline, pos)
+    
+    if len(text) - pos <= SLOW_PATH_WINDOW_CHARS:
+        return regex.search(text, pos)
+    
+    step = SLOW_PATH_WINDOW_CHARS - SLOW_PATH_WINDOW_OVERLAP
+    for start in range(pos, len(text), step):
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+        m = regex.search(text, start, start + SLOW_PATH_WINDOW_CHARS)
+        if m:
+            return m
+        if start + SLOW_PATH_WINDOW_CHARS >= len(text):
+            break
+    return None
+
+
+def _candidate_search(
+    regex: "re.Pattern",
+    head: "re.Pattern",
+    linear: bool,
+    text: str,
+    deadline: Optional[float],
+    pos: int,
+):
+    """Try regex at each start its head matches, checking the deadline between tries"""
+    while pos <= len(text):
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+        candidate = head.search(text, pos) if linear else windowed_search(head, text, deadline, pos)
+        if candidate is None:
+            return None
+        m = regex.match(text, candidate.start())
+        if m:
+            return m
+        pos = candidate.start() + 1
+    return None
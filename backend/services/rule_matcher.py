@@ -0,0 +1,293 @@
+"""
+Rule Matcher - Compiled multi-pattern matching for compliance rules
+Folds a whole rule set into a single regex scan per segment
+"""
+
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+from loguru import logger
+import re
+import time
+
+from services.rule_compiler import first_chars
+from services.rule_prefilter import KeywordIndex
+
+if TYPE_CHECKING:
+    from services.compliance_engine import ComplianceRule
+
+
+# Backreferences cannot survive being folded into a shared alternation
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+# Patterns per second-level bucket used to resolve which rule fired
+BUCKET_SIZE = 32
+
+# Above this many prefilter candidates a full single scan is cheaper
+MAX_DIRECT_CHECKS = 48
+
+
+def strip_captures(source: str) -> str:
+    """
+    Rewrite capturing groups in a regex source as non-capturing groups
+    The sre engine saves group marks on every branch attempt, which makes a
+    large alternation full of captures dramatically slower than separate scans
+    """
+    out = []
+    i = 0
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            out.append(source[i:i + 2])
+            i += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            # A leading "]" or "^]" is a literal inside the class
+            if source[i + 1:i + 2] == "^":
+                out.append("[^")
+                i += 2
+            else:
+                out.append(char)
+                i += 1
+            if source[i:i + 1] == "]":
+                out.append("]")
+                i += 1
+            continue
+        elif char == "(":
+            if source[i + 1:i + 2] != "?":
+                out.append("(?:")
+                i += 1
+                continue
+            if source[i + 2:i + 4] == "P<":
+                out.append("(?:")
+                i = source.index(">", i) + 1
+                continue
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def _fired_in_order(rules: List["ComplianceRule"], fired: Set[int]) -> List["ComplianceRule"]:
+    return [rule for rule in rules if id(rule) in fired]
+
+
+def _first_critical(rules: List["ComplianceRule"], fired: Set[int]) -> Optional[int]:
+    """Position of the first fired critical rule, if any"""
+    for position, rule in enumerate(rules):
+        if id(rule) in fired and rule.severity == "critical":
+            return position
+    return None
+
+
+class _Bucket:
+    """A slice of folded patterns behind its own combined regex"""
+    
+    def __init__(self, entries: List[Tuple["ComplianceRule", re.Pattern, str]], flags: int):
+        self.entries = entries
+        self.regex = re.compile("|".join(source for _, _, source in entries), flags)
+
+
+class RuleMatcher:
+    """
+    Compiled matcher over a list of compliance rules
+    
+    Every foldable pattern is rewritten without capture groups and filed
+    under the characters its matches can start with. The combined regex
+    dispatches on the character at each offset with a cheap lookahead, so
+    only the patterns that could start there are tried and a clean segment
+    costs a single scan. Hits are resolved to rules through small bucketed
+    alternations. Patterns that cannot be folded are checked one by one.
+    
+    A keyword prefilter runs first: when only a handful of rules have their
+    required words present, those rules are checked directly instead.
+    
+    Only linear-time patterns take this fast path. Patterns the rule compiler
+    flagged as super-linear run afterwards in bounded windows, and are
+    skipped once the check's deadline has passed.
+    
+    Building the combined regexes dominates startup for large rule sets, so
+    a matcher over a subset of another matcher's rules (a product focus) can
+    pass that one as scanner: its full scans reuse the scanner's regexes and
+    keep only the rules of the subset.
+    """
+    
+    def __init__(
+        self,
+        rules: List["ComplianceRule"],
+        flags: int = re.IGNORECASE,
+        scanner: Optional["RuleMatcher"] = None,
+    ):
+        self.rules = list(rules)
+        self.flags = flags
+        self._fallback: List[Tuple["ComplianceRule", re.Pattern]] = []
+        self._dispatch: Dict[str, List[_Bucket]] = {}
+        self._undispatched: List[_Bucket] = []
+        self._combined: Optional[re.Pattern] = None
+        self._scanner = scanner
+        self._rule_ids = {id(rule) for rule in self.rules}
+        self.index = KeywordIndex(self.rules)
+        if scanner is not None:
+            return
+        
+        by_char: Dict[str, List[Tuple["ComplianceRule", re.Pattern, str]]] = {}
+        undispatched: List[Tuple["ComplianceRule", re.Pattern, str]] = []
+        for rule in self.rules:
+            for pattern in rule.fast_patterns:
+                source = self._fold(pattern)
+                if source is None:
+                    self._fallback.append((rule, pattern))
+                    continue
+                chars = first_chars(source, flags)
+                if chars is None:
+                    undispatched.append((rule, pattern, source))
+                    continue
+                for char in chars:
+                    by_char.setdefault(char, []).append((rule, pattern, source))
+        
+        branches = []
+        for char, entries in by_char.items():
+            self._dispatch[char] = self._bucket(entries)
+            alternation = "|".join(source for _, _, source in entries)
+            branches.append(f"(?={re.escape(char)})(?:{alternation})")
+        self._undispatched = self._bucket(undispatched)
+        branches.extend(source for _, _, source in undispatched)
+        
+        self._combined = re.compile("|".join(branches), flags) if branches else None
+        
+        slow_count = sum(len(rule.slow_patterns) for rule in self.rules)
+        logger.debug(
+            f"Rule matcher: {self.index.indexed_count}/{len(self.rules)} rules keyword-indexed, "
+            f"{len(self._fallback)} patterns checked individually, {slow_count} on the slow path"
+        )
+    
+    def _fold(self, pattern: re.Pattern) -> Optional[str]:
+        """Capture-free source for a pattern, or None if it cannot be folded"""
+        if pattern.flags & ~re.UNICODE != self.flags or _BACKREFERENCE.search(pattern.pattern):
+            return None
+        
+        source = f"(?:{strip_captures(pattern.pattern)})"
+        try:
+            re.compile(source, self.flags)
+        except re.error:
+            return None
+        return source
+    
+    def _bucket(self, entries) -> List[_Bucket]:
+        return [
+            _Bucket(entries[start:start + BUCKET_SIZE], self.flags)
+            for start in range(0, len(entries), BUCKET_SIZE)
+        ]
+    
+    def _resolve(self, text: str, pos: int, fired: Set[int]):
+        """Record every rule with a pattern matching exactly at pos"""
+        dispatched = self._dispatch.get(text[pos:pos + 1].lower())
+        if dispatched is None:
+            # Case folding can map a character outside the dispatch keys
+            dispatched = [bucket for buckets in self._dispatch.values() for bucket in buckets]
+        buckets = dispatched + self._undispatched
+        for bucket in buckets:
+            if not bucket.regex.match(text, pos):
+                continue
+            for rule, pattern, _ in bucket.entries:
+                if id(rule) not in fired and pattern.match(text, pos):
+                    fired.add(id(rule))
+    
+    def match(
+        self,
+        text: str,
+        deadline: Optional[float] = None,
+        stop_on_critical: bool = False,
+    ) -> List["ComplianceRule"]:
+        """
+        Return the rules that fire on text, in rule order
+        deadline is a time.perf_counter() value bounding the slow path
+        stop_on_critical stops matching at the first critical rule that fires
+        """
+        return self.match_complete(text, deadline, stop_on_critical)[0]
+    
+    def match_complete(
+        self,
+        text: str,
+        deadline: Optional[float] = None,
+        stop_on_critical: bool = False,
+    ) -> Tuple[List["ComplianceRule"], bool]:
+        """
+        Like match, also telling whether every rule was checked
+        The result is incomplete when slow-path rules were skipped over budget,
+        or when matching stopped early at a critical rule
+        """
+        candidates = self.index.candidates(text)
+        fired: Set[int] = set()
+        if len(candidates) > MAX_DIRECT_CHECKS:
+            fired.update(id(rule) for rule in self.scan(text, slow_path=False))
+        else:
+            for rule in candidates:
+                if rule.check_fast(text):
+                    fired.add(id(rule))
+                    if stop_on_critical and rule.severity == "critical":
+                        break
+        
+        if stop_on_critical:
+            critical = _first_critical(candidates, fired)
+            if critical is not None:
+                return _fired_in_order(candidates[:critical + 1], fired), False
+        
+        skipped = 0
+        for rule in candidates:
+            if id(rule) in fired or not rule.slow_patterns:
+                continue
+            if deadline is not None and time.perf_counter() > deadline:
+                skipped += 1
+                continue
+            if rule.check_slow(text, deadline):
+                fired.add(id(rule))
+                if stop_on_critical and rule.severity == "critical":
+                    return _fired_in_order(candidates, fired), False
+        
+        if skipped:
+            logger.warning(f"Compliance check over budget, skipped {skipped} slow-path rules")
+        
+        return _fired_in_order(candidates, fired), not skipped
+    
+    def scan(self, text: str, slow_path: bool = True) -> List["ComplianceRule"]:
+        """
+        Run the single combined scan over every rule, without prefiltering
+        """
+        if self._scanner is not None:
+            fired = {id(rule) for rule in self._scanner.scan(text, slow_path=False)} & self._rule_ids
+        else:
+            fired = self._scan_fast(text)
+        
+        if slow_path:
+            for rule in self.rules:
+                if id(rule) not in fired and rule.check_slow(text):
+                    fired.add(id(rule))
+        
+        return _fired_in_order(self.rules, fired)
+    
+    def _scan_fast(self, text: str) -> Set[int]:
+        """Ids of the rules whose linear-time patterns match text"""
+        fired: Set[int] = set()
+        
+        if self._combined is not None:
+            pos = 0
+            while pos <= len(text):
+                m = self._combined.search(text, pos)
+                if m is None:
+                    break
+                
+                # Several rules may match at this offset; resolve all of them
+                self._resolve(text, m.start(), fired)
+                pos = m.start() + 1
+        
+        for rule, pattern in self._fallback:
+            if id(rule) not in fired and pattern.search(text):
+                fired.add(id(rule))
+        return fired
+    
+    def match_ids(self, text: str) -> List[str]:
+        """Return the ids of the rules that fire on text"""
+        return [rule.rule_id for rule in self.match(text)]
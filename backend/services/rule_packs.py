@@ -0,0 +1,198 @@
+"""
+Rule Packs - Compliance rules shipped as JSON or YAML data files
+Pattern analysis is cached on disk under each pack's content hash
+"""
+
+from typing import Dict, List, Optional
+from pathlib import Path
+from loguru import logger
+import hashlib
+import json
+import os
+import re
+import sys
+
+import yaml
+
+from config import settings
+from services.compliance_engine import ComplianceRule
+from services.rule_compiler import CompiledPattern, compile_pattern
+
+# Bump when the cached analysis format or the compiler's output changes
+CACHE_FORMAT_VERSION = 1
+
+PACK_SUFFIXES = {".json", ".yaml", ".yml"}
+
+SEVERITIES = {"critical", "warning", "info"}
+
+REQUIRED_FIELDS = ["rule_id", "name", "category", "patterns", "severity", "message"]
+
+
+class RulePackError(ValueError):
+    """A rule pack file is malformed"""
+
+
+def _parse_pack(path: Path, content: bytes) -> List[Dict]:
+    """Parse a pack file into its list of rule definitions"""
+    try:
+        if path.suffix == ".json":
+            data = json.loads(content)
+        else:
+            data = yaml.safe_load(content)
+    except (ValueError, yaml.YAMLError) as e:
+        raise RulePackError(f"{path}: cannot parse rule pack: {e}") from e
+    
+    # A pack is either a list of rules or a mapping with a "rules" list
+    rules = data.get("rules") if isinstance(data, dict) else data
+    if not isinstance(rules, list):
+        raise RulePackError(f"{path}: expected a list of rules")
+    return rules
+
+
+def _validate(path: Path, definitions: List[Dict]):
+    """Check every rule definition before anything is compiled"""
+    seen = set()
+    for index, definition in enumerate(definitions):
+        if not isinstance(definition, dict):
+            raise RulePackError(f"{path}: rule #{index} is not a mapping")
+        
+        missing = [field for field in REQUIRED_FIELDS if not definition.get(field)]
+        if missing:
+            raise RulePackError(f"{path}: rule #{index} is missing {', '.join(missing)}")
+        
+        rule_id = definition["rule_id"]
+        if rule_id in seen:
+            raise RulePackError(f"{path}: duplicate rule_id {rule_id}")
+        seen.add(rule_id)
+        
+        if definition["severity"] not in SEVERITIES:
+            raise RulePackError(f"{path}: rule {rule_id} has unknown severity {definition['severity']}")
+        
+        patterns = definition["patterns"]
+        if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+            raise RulePackError(f"{path}: rule {rule_id} patterns must be a list of strings")
+        
+        products = definition.get("products", [])
+        if not isinstance(products, list) or not all(isinstance(p, str) for p in products):
+            raise RulePackError(f"{path}: rule {rule_id} products must be a list of strings")
+
+
+def _cache_key(content: bytes) -> str:
+    """
+    Content hash of a pack, salted with what the cached analysis depends on
+    Possessive rewrites depend on the Python version running the compiler
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_FORMAT_VERSION}:{sys.version_info[:2]}:".encode())
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def _read_cache(cache_file: Path) -> Optional[List[ComplianceRule]]:
+    """Rules from a pack's cache file; anything missing or malformed is a cache miss"""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)["rules"]
+        return [
+            _build_rule(
+                entry["definition"],
+                [CompiledPattern.from_dict(data) for data in entry["compiled"]],
+            )
+            for entry in cached
+        ]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, re.error) as e:
+        logger.warning(f"Ignoring unreadable rule pack cache {cache_file}: {e!r}")
+        return None
+
+
+def _write_cache(cache_file: Path, compiled: List[Dict]):
+    """Write the cache atomically so concurrent workers never read a partial file"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"rules": compiled}, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning(f"Could not write rule pack cache {cache_file}: {e}")
+
+
+def _build_rule(definition: Dict, compiled_patterns: List[CompiledPattern]) -> ComplianceRule:
+    return ComplianceRule(
+        rule_id=definition["rule_id"],
+        name=definition["name"],
+        category=definition["category"],
+        patterns=definition["patterns"],
+        severity=definition["severity"],
+        message=definition["message"],
+        suggested_response=definition.get("suggested_response"),
+        regulation_reference=definition.get("regulation_reference"),
+        compiled_patterns=compiled_patterns,
+        products=definition.get("products"),
+    )
+
+
+def load_rule_pack(path: Path, cache_dir: Optional[Path] = None) -> List[ComplianceRule]:
+    """
+    Load the rules in a pack file
+    A pack whose content hash is in the cache skips validation and analysis
+    """
+    if cache_dir is None:
+        cache_dir = Path(settings.RULE_PACK_CACHE_DIR)
+    content = path.read_bytes()
+    cache_file = cache_dir / f"{_cache_key(content)}.json"
+    
+    rules = _read_cache(cache_file)
+    if rules is not None:
+        logger.info(f"Loaded {len(rules)} rules from {path} (cached)")
+        return rules
+    
+    definitions = _parse_pack(path, content)
+    _validate(path, definitions)
+    
+    rules = []
+    entries = []
+    for definition in definitions:
+        try:
+            compiled = [compile_pattern(pattern) for pattern in definition["patterns"]]
+        except re.error as e:
+            raise RulePackError(f"{path}: rule {definition['rule_id']} has an invalid pattern: {e}") from e
+        rules.append(_build_rule(definition, compiled))
+        entries.append({"definition": definition, "compiled": [c.to_dict() for c in compiled]})
+    
+    _write_cache(cache_file, entries)
+    logger.info(f"Loaded {len(rules)} rules from {path}")
+    return rules
+
+
+def find_rule_packs(paths: List[str]) -> List[Path]:
+    """Expand configured files and directories into pack files, in a stable order"""
+    packs = []
+    for entry in paths:
+        path = Path(entry)
+        if path.is_dir():
+            packs.extend(sorted(p for p in path.iterdir() if p.suffix in PACK_SUFFIXES))
+        elif path.is_file():
+            packs.append(path)
+        else:
+            logger.debug(f"Rule pack path not found: {path}")
+    return packs
+
+
+def load_rule_packs(paths: Optional[List[str]] = None) -> List[ComplianceRule]:
+    """
+    Load every configured rule pack
+    A broken pack is logged and skipped so the remaining rules still load
+    """
+    if paths is None:
+        paths = settings.RULE_PACK_PATHS
+    
+    rules = []
+    for path in find_rule_packs(paths):
+        try:
+            rules.extend(load_rule_pack(path))
+        except (OSError, RulePackError) as e:
+            logger.error(f"Skipping rule pack {path}: {e}")
+    return rules
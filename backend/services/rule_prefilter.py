@@ -0,0 +1,185 @@
+"""
+Rule Prefilter - Literal keyword extraction and inverted index
+Skips regex work for rules whose required words never appear in a segment
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, TYPE_CHECKING
+import re
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse, sre_constants
+
+if TYPE_CHECKING:
+    from services.compliance_engine import ComplianceRule
+
+
+# Shorter keywords match too many tokens to be worth indexing
+MIN_KEYWORD_LENGTH = 3
+
+_TOKEN = re.compile(r"\w+")
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(sre_constants.POSSESSIVE_REPEAT)
+
+_WORD_BOUNDARIES = {
+    sre_constants.AT_BOUNDARY,
+    sre_constants.AT_BEGINNING,
+    sre_constants.AT_BEGINNING_STRING,
+}
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _is_non_word_class(items) -> bool:
+    """True if a character class can only match non-word characters"""
+    for op, av in items:
+        if op is sre_constants.LITERAL and not _is_word(chr(av)):
+            continue
+        if op is sre_constants.CATEGORY and av in (
+            sre_constants.CATEGORY_SPACE,
+            sre_constants.CATEGORY_NOT_WORD,
+        ):
+            continue
+        return False
+    return True
+
+
+def _better(current: Optional[FrozenSet[str]], candidate: Optional[FrozenSet[str]]):
+    """Prefer keyword sets whose shortest word is longest, then the smallest set"""
+    if candidate is None:
+        return current
+    if current is None:
+        return candidate
+    score = lambda keywords: (min(len(k) for k in keywords), -len(keywords))
+    return candidate if score(candidate) > score(current) else current
+
+
+def _required(items, boundary: bool) -> Optional[FrozenSet[str]]:
+    """
+    Find a set of keywords, one of which starts a word in every match
+    boundary tells whether the text before items is known to end a word
+    """
+    best = None
+    run: List[str] = []
+    run_anchored = False
+    
+    def flush():
+        nonlocal best
+        if run and run_anchored and len(run) >= MIN_KEYWORD_LENGTH:
+            best = _better(best, frozenset(["".join(run)]))
+    
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            char = chr(av).lower()
+            if _is_word(char):
+                if not run:
+                    run_anchored = boundary
+                run.append(char)
+            else:
+                flush()
+                run = []
+            boundary = not _is_word(char)
+            continue
+        
+        flush()
+        run = []
+        
+        if op is sre_constants.AT:
+            boundary = boundary or av in _WORD_BOUNDARIES
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            # Lookarounds consume nothing, so the context is unchanged
+            pass
+        elif op is sre_constants.IN:
+            boundary = _is_non_word_class(av)
+        elif op is sre_constants.SUBPATTERN:
+            best = _better(best, _required(av[-1], boundary))
+            boundary = False
+        elif op is sre_constants.BRANCH:
+            options = [_required(branch, boundary) for branch in av[1]]
+            if all(option is not None for option in options):
+                best = _better(best, frozenset().union(*options))
+            boundary = False
+        elif op in _REPEATS:
+            if av[0] >= 1:
+                best = _better(best, _required(av[2], boundary))
+            boundary = False
+        else:
+            boundary = False
+    
+    flush()
+    return best
+
+
+def extract_keywords(source: str, flags: int = re.IGNORECASE) -> Optional[FrozenSet[str]]:
+    """
+    Extract the literal keywords a pattern needs in order to match
+    Every match contains a word starting with one of the returned keywords,
+    or None is returned when no such guarantee can be made
+    """
+    try:
+        return _required(sre_parse.parse(source, flags), False)
+    except Exception:
+        return None
+
+
+def rule_keywords(sources: Iterable[str], flags: int = re.IGNORECASE) -> Optional[FrozenSet[str]]:
+    """Keywords for a rule: any pattern firing implies one of them appears"""
+    return combine_keywords(extract_keywords(source, flags) for source in sources)
+
+
+def combine_keywords(
+    pattern_keywords: Iterable[Optional[FrozenSet[str]]],
+) -> Optional[FrozenSet[str]]:
+    """Combine per-pattern keyword sets into the keyword set for a rule"""
+    keywords: Set[str] = set()
+    for found in pattern_keywords:
+        if found is None:
+            return None
+        keywords |= found
+    return frozenset(keywords) if keywords else None
+
+
+class KeywordIndex:
+    """
+    Inverted index from keyword to the rules that require it
+    Rules without extractable keywords are always candidates
+    """
+    
+    def __init__(self, rules: List["ComplianceRule"]):
+        self.rules = list(rules)
+        self._position = {id(rule): index for index, rule in enumerate(self.rules)}
+        self._index: Dict[str, List["ComplianceRule"]] = {}
+        self._always: List["ComplianceRule"] = []
+        
+        for rule in self.rules:
+            if rule.keywords is None:
+                self._always.append(rule)
+                continue
+            for keyword in rule.keywords:
+                self._index.setdefault(keyword, []).append(rule)
+        
+        self._lengths = sorted({len(keyword) for keyword in self._index})
+    
+    @property
+    def indexed_count(self) -> int:
+        return len(self.rules) - len(self._always)
+    
+    def candidates(self, text: str) -> List["ComplianceRule"]:
+        """
+        Rules that may fire on text, in rule order
+        """
+        found = {id(rule): rule for rule in self._always}
+        
+        for token in set(_TOKEN.findall(text.lower())):
+            for length in self._lengths:
+                if length > len(token):
+                    break
+                for rule in self._index.get(token[:length], ()):
+                    found[id(rule)] = rule
+        
+        return sorted(found.values(), key=lambda rule: self._position[id(rule)])
@@ -0,0 +1,82 @@
+"""
+Session Queue - Bounded per-session work queue with partial-transcript coalescing
+Keeps bursty ASR output from building up unbounded latency
+"""
+
+from collections import deque
+from typing import Any, Deque, Hashable, Optional
+import asyncio
+
+
+class _Entry:
+    __slots__ = ("key", "item", "droppable")
+    
+    def __init__(self, key: Optional[Hashable], item: Any, droppable: bool):
+        self.key = key
+        self.item = item
+        self.droppable = droppable
+
+
+class SessionQueue:
+    """
+    Bounded FIFO between a WebSocket receive loop and its worker task
+    
+    Droppable items (partial transcripts) are superseded in place by a newer
+    item with the same key, and evicted first when the queue is full. Items
+    that must not be lost (final transcripts) wait for room instead, which
+    pushes back on the sender.
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.coalesced = 0
+        self.dropped = 0
+        self._entries: Deque[_Entry] = deque()
+        self._changed = asyncio.Condition()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    async def put(self, item: Any, key: Optional[Hashable] = None, droppable: bool = False) -> bool:
+        """
+        Queue an item, returning False if it was dropped
+        A queued droppable item with the same key is replaced by this one
+        """
+        async with self._changed:
+            if key is not None:
+                for entry in self._entries:
+                    if entry.key == key and entry.droppable:
+                        entry.item = item
+                        entry.droppable = droppable
+                        self.coalesced += 1
+                        return True
+            
+            while len(self._entries) >= self.maxsize:
+                if self._evict_droppable():
+                    break
+                if droppable:
+                    self.dropped += 1
+                    return False
+                await self._changed.wait()
+            
+            self._entries.append(_Entry(key, item, droppable))
+            self._changed.notify_all()
+            return True
+    
+    async def get(self) -> Any:
+        """Wait for and remove the oldest item"""
+        async with self._changed:
+            while not self._entries:
+                await self._changed.wait()
+            entry = self._entries.popleft()
+            self._changed.notify_all()
+            return entry.item
+    
+    def _evict_droppable(self) -> bool:
+        """Drop the oldest droppable item to make room"""
+        for entry in self._entries:
+            if entry.droppable:
+                self._entries.remove(entry)
+                self.dropped += 1
+                return True
+        return False
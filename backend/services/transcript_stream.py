@@ -0,0 +1,80 @@
+"""
+Transcript Stream - Resumable compliance matching across transcript segments
+Catches violations that ASR splits over two segments at constant cost per segment
+"""
+
+from typing import Hashable, Optional, Set, Tuple
+import re
+
+from config import settings
+
+
+_WHITESPACE = re.compile(r"\s")
+
+
+def _join(tail: str, text: str) -> str:
+    return f"{tail} {text}" if tail and text else tail or text
+
+
+class TranscriptStream:
+    """
+    Matching state for one speaker's running transcript in a session
+    
+    Only a bounded tail of the text already checked is kept. Each new segment
+    is checked as tail + segment, and only matches ending after the tail are
+    reported, so a phrase split across segments fires exactly once without
+    rescanning the whole transcript. The space joining tail and segment
+    counts as new text: a match that needs it could not fire on the tail.
+    
+    A segment fed again under the same segment_id (a partial transcript being
+    revised) replaces the previous text of that segment, and rules already
+    reported for the segment are remembered so they do not fire twice.
+    """
+    
+    def __init__(self, overlap_chars: Optional[int] = None):
+        self.overlap_chars = (
+            settings.COMPLIANCE_STREAM_OVERLAP_CHARS if overlap_chars is None else overlap_chars
+        )
+        self.speaker: Optional[str] = None
+        self.tail = ""
+        self.segment_id: Optional[Hashable] = None
+        self.segment = ""
+        # Rules already reported for the current segment
+        self.reported: Set[str] = set()
+    
+    def feed(self, speaker: str, text: str, segment_id: Optional[Hashable] = None) -> Tuple[str, int]:
+        """
+        Append a segment to the stream, or revise the current one
+        Returns the text to check and the offset where the new text starts
+        """
+        if speaker != self.speaker:
+            # A change of speaker ends the phrase being tracked
+            self.reset()
+            self.speaker = speaker
+        
+        if segment_id is None or segment_id != self.segment_id:
+            # The previous segment is final; keep a bounded tail of it
+            self.tail = self._trim(_join(self.tail, self.segment))
+            self.segment_id = segment_id
+            self.reported = set()
+        
+        self.segment = text.strip()
+        return _join(self.tail, self.segment), len(self.tail)
+    
+    def reset(self):
+        """Forget the tracked text"""
+        self.speaker = None
+        self.tail = ""
+        self.segment_id = None
+        self.segment = ""
+        self.reported = set()
+    
+    def _trim(self, window: str) -> str:
+        """Keep the last overlap_chars of window, starting at a word boundary"""
+        if len(window) <= self.overlap_chars:
+            return window
+        
+        tail = window[-self.overlap_chars:]
+        # Drop the leading partial word so it cannot match as a whole word
+        space = _WHITESPACE.search(tail)
+        return tail[space.end():] if space else ""
@@ -0,0 +1,57 @@
+"""
+Transcript Window - Time-based sliding window over recent transcript segments
+Segments older than WINDOW_SIZE_SECONDS are evicted (privacy-first)
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import time
+
+from config import settings
+
+
+class TranscriptWindow:
+    """
+    Ring buffer of transcript segments evicted by age
+    
+    Segments are stamped with a monotonic receive time, so eviction does not
+    depend on client clocks. Appends and evictions are O(1), and max_segments
+    bounds memory however fast segments arrive.
+    """
+    
+    def __init__(
+        self,
+        window_seconds: Optional[float] = None,
+        max_segments: Optional[int] = None,
+        sliding: Optional[bool] = None,
+    ):
+        self.window_seconds = settings.WINDOW_SIZE_SECONDS if window_seconds is None else window_seconds
+        self.sliding = settings.ENABLE_SLIDING_WINDOW if sliding is None else sliding
+        max_segments = settings.WINDOW_MAX_SEGMENTS if max_segments is None else max_segments
+        self._segments: Deque[Tuple[float, Dict]] = deque(maxlen=max_segments)
+    
+    def __len__(self) -> int:
+        self.evict()
+        return len(self._segments)
+    
+    def append(self, segment: Dict, now: Optional[float] = None):
+        """Add a segment, evicting any that have aged out"""
+        now = time.monotonic() if now is None else now
+        self.evict(now)
+        self._segments.append((now, segment))
+    
+    def evict(self, now: Optional[float] = None):
+        """Drop segments older than the window"""
+        if not self.sliding:
+            return
+        cutoff = (time.monotonic() if now is None else now) - self.window_seconds
+        while self._segments and self._segments[0][0] < cutoff:
+            self._segments.popleft()
+    
+    def segments(self) -> List[Dict]:
+        """Segments still inside the window, oldest first"""
+        self.evict()
+        return [segment for _, segment in self._segments]
+    
+    def clear(self):
+        self._segments.clear()
@@ -0,0 +1,206 @@
+"""
+Transcription - Pluggable speech-to-text engines run in worker processes
+Decoding is CPU-bound, so it never runs on the event loop serving WebSockets
+"""
+
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Type
+from loguru import logger
+import asyncio
+import importlib.util
+import os
+import time
+import zlib
+
+import numpy as np
+
+from config import settings
+from services.metrics import transcription_seconds
+
+
+# Phrases the mock engine picks from, a mix of compliant and violating lines
+MOCK_SCRIPT = [
+    "In clinical trials, patients saw a meaningful reduction in A1C.",
+    "The most common side effects include nausea and headache.",
+    "Let me walk you through the dosing schedule approved by the FDA.",
+    "You can use it for weight loss, many doctors use it for that.",
+    "Don't worry about side effects, they're minimal.",
+    "Would you like to see the prescribing information?",
+]
+
+
+class TranscriptionEngine(ABC):
+    """
+    Speech-to-text engine
+    Engines are built and loaded inside each worker process, so transcribe()
+    is synchronous and may block
+    """
+    
+    name = "base"
+    
+    # CPU-bound engines run in the worker pool, others inline
+    cpu_bound = True
+    
+    def load(self):
+        """Load models, once per worker process"""
+    
+    @abstractmethod
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        """Transcribe mono int16 samples"""
+
+
+class MockTranscriptionEngine(TranscriptionEngine):
+    """
+    Deterministic engine for tests and load runs
+    The same audio always yields the same line from MOCK_SCRIPT, whatever was
+    said, so it is only used when TRANSCRIPTION_PROVIDER is "mock"
+    """
+    
+    name = "mock"
+    cpu_bound = False
+    
+    def __init__(self, script: Optional[List[str]] = None):
+        self.script = script or MOCK_SCRIPT
+    
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        if len(samples) == 0:
+            return ""
+        return self.script[zlib.crc32(samples.tobytes()) % len(self.script)]
+
+
+class WhisperLocalEngine(TranscriptionEngine):
+    """Offline Whisper on CPU (the openai-whisper package)"""
+    
+    name = "whisper"
+    
+    # Whisper models are trained on 16 kHz audio
+    SAMPLE_RATE = 16000
+    
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or settings.WHISPER_MODEL
+        self._model = None
+    
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("whisper") is not None
+    
+    def load(self):
+        import torch
+        import whisper
+        
+        # torch defaults to one intra-op thread per core in every worker process,
+        # which oversubscribes the host once there is a worker per core
+        torch.set_num_threads(max(1, settings.TRANSCRIPTION_WORKER_THREADS))
+        self._model = whisper.load_model(self.model_name, device="cpu")
+        logger.info(f"Loaded Whisper model {self.model_name} in worker {os.getpid()}")
+    
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        if len(samples) == 0:
+            return ""
+        if sample_rate != self.SAMPLE_RATE:
+            raise ValueError(f"Whisper needs {self.SAMPLE_RATE} Hz audio, got {sample_rate} Hz")
+        if self._model is None:
+            self.load()
+        audio = samples.astype(np.float32) / 32768.0
+        result = self._model.transcribe(audio, fp16=False, condition_on_previous_text=False)
+        return result["text"].strip()
+
+
+ENGINES: Dict[str, Type[TranscriptionEngine]] = {
+    MockTranscriptionEngine.name: MockTranscriptionEngine,
+    WhisperLocalEngine.name: WhisperLocalEngine,
+}
+
+
+def resolve_provider(provider: str) -> Optional[str]:
+    """
+    Engine name for a TRANSCRIPTION_PROVIDER value, or None when it cannot run
+    There is no fallback to the mock engine: it would turn real audio into
+    scripted lines and nudge reps on things they never said. Without an
+    engine, streamed audio is not transcribed; transcript messages still work
+    """
+    if provider not in ENGINES:
+        logger.error(f"No local transcription engine for {provider!r}, audio transcription disabled")
+        return None
+    if provider == WhisperLocalEngine.name and not WhisperLocalEngine.available():
+        logger.error("openai-whisper is not installed, audio transcription disabled")
+        return None
+    return provider
+
+
+# Engine owned by each transcription worker process
+_worker_engine: Optional[TranscriptionEngine] = None
+
+
+def _init_transcription_worker(provider: str):
+    """Build and load the engine once per worker process"""
+    global _worker_engine
+    _worker_engine = ENGINES[provider]()
+    _worker_engine.load()
+
+
+def _transcribe_in_worker(samples: np.ndarray, sample_rate: int) -> str:
+    return _worker_engine.transcribe(samples, sample_rate)
+
+
+class TranscriptionBackend:
+    """
+    Runs the configured engine in a process pool sized to the host's cores
+    The pool starts on first use, so processes that never transcribe do not
+    pay for model loading. When the provider cannot run, transcribe() returns
+    no text
+    """
+    
+    def __init__(self, provider: Optional[str] = None):
+        self.provider = resolve_provider(provider or settings.TRANSCRIPTION_PROVIDER)
+        self.engine_class = ENGINES[self.provider] if self.provider else None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inline: Optional[TranscriptionEngine] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.engine_class is not None
+    
+    def _pool_workers(self) -> int:
+        """
+        Number of transcription worker processes
+        By default workers times their threads fill the host's cores
+        """
+        threads = max(1, settings.TRANSCRIPTION_WORKER_THREADS)
+        return settings.TRANSCRIPTION_POOL_WORKERS or max(1, (os.cpu_count() or 1) // threads)
+    
+    async def transcribe(self, samples: np.ndarray, sample_rate: Optional[int] = None) -> str:
+        """Transcribe mono int16 samples without blocking the event loop"""
+        if not self.enabled or len(samples) == 0:
+            return ""
+        sample_rate = sample_rate or settings.AUDIO_SAMPLE_RATE
+        started = time.monotonic()
+        
+        if not self.engine_class.cpu_bound:
+            if self._inline is None:
+                self._inline = self.engine_class()
+                self._inline.load()
+            text = self._inline.transcribe(samples, sample_rate)
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._pool_workers(),
+                    initializer=_init_transcription_worker,
+                    initargs=(self.provider,),
+                )
+            loop = asyncio.get_running_loop()
+            text = await loop.run_in_executor(self._pool, _transcribe_in_worker, samples, sample_rate)
+        
+        transcription_seconds.observe(time.monotonic() - started)
+        return text
+    
+    def shutdown(self):
+        """Release the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Global instance
+transcription_backend = TranscriptionBackend()
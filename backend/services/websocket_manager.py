@@ -2,15 +2,46 @@
 WebSocket Manager - Handles real-time WebSocket connections
 """
 
-from fastapi import WebSocket
-from typing import Dict, Set
+from fastapi import WebSocket, WebSocketDisconnect
+from typing import Dict, List, Optional, Set
 from loguru import logger
 import json
 import asyncio
+import base64
+import time
 from datetime import datetime
 
-from services.compliance_engine import ComplianceEngine
+from config import settings
+from services.engine_registry import compliance_registry
 from services.audio_processor import AudioProcessor
+from services.backplane import backplane
+from services.copilot_service import copilot_service
+from services.endpointer import Endpointer, Utterance
+from services.jitter_buffer import JitterBuffer
+from services.metrics import (
+    audio_chunks_total,
+    audio_frames_total,
+    compliance_check_seconds,
+    nudge_latency_seconds,
+    nudge_send_seconds,
+    nudges_total,
+    sessions_reaped_total,
+    transcript_queue_seconds,
+    transcripts_total,
+    violations_total,
+)
+from services.session_queue import SessionQueue
+from services.transcript_stream import TranscriptStream
+from services.transcript_window import TranscriptWindow
+from services.transcription import transcription_backend
+from services.ws_protocol import JSONCodec, ProtocolError, decode_message, negotiate_codec
+
+
+# Nudges are ranked critical first
+SEVERITY_PRIORITY = {"critical": 0, "warning": 1, "info": 2}
+
+# WebSocket close code for "Try Again Later" (RFC 6455 registry)
+CLOSE_TRY_AGAIN_LATER = 1013
 
 
 class WebSocketManager:
@@ -21,29 +52,85 @@ class WebSocketManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.session_data: Dict[str, Dict] = {}
-        self.compliance_engine = ComplianceEngine()
+        self.workers: Dict[str, asyncio.Task] = {}
+        self.asr_workers: Dict[str, asyncio.Task] = {}
+        self.codecs: Dict[str, JSONCodec] = {}
         self.audio_processor = AudioProcessor()
+        self._heartbeat: Optional[asyncio.Task] = None
     
-    async def connect(self, websocket: WebSocket, session_id: str):
-        """Accept and register a new WebSocket connection"""
-        await websocket.accept()
+    async def connect(self, websocket: WebSocket, session_id: str) -> bool:
+        """
+        Accept and register a new WebSocket connection
+        Returns False if the connection was refused for lack of capacity
+        """
+        # Message encoding is negotiated through the WebSocket subprotocol
+        codec = negotiate_codec(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=codec.subprotocol)
+        
+        # Admission control: reconnects of a live session are always let in
+        if (
+            session_id not in self.active_connections
+            and len(self.active_connections) >= settings.MAX_CONCURRENT_SESSIONS
+        ):
+            logger.warning(f"Refusing WebSocket {session_id}: {len(self.active_connections)} sessions active")
+            await websocket.close(
+                code=CLOSE_TRY_AGAIN_LATER,
+                reason=f"Server at capacity, retry after {settings.ADMISSION_RETRY_AFTER_SECONDS}s",
+            )
+            return False
+        
         self.active_connections[session_id] = websocket
+        self.codecs[session_id] = codec
+        now = time.monotonic()
         self.session_data[session_id] = {
             "connected_at": datetime.utcnow(),
-            "transcript_buffer": [],
+            "last_seen": now,
+            "last_activity": now,
+            "transcript_buffer": TranscriptWindow(),
             "violations": [],
+            "stream": TranscriptStream(),
+            "queue": SessionQueue(settings.SESSION_QUEUE_MAXSIZE),
+            "last_nudged": {},
+            "audio": self.audio_processor.open_stream(),
+            "jitter": JitterBuffer(),
+            "endpointer": Endpointer(session_id),
+            "asr_queue": SessionQueue(settings.SESSION_QUEUE_MAXSIZE),
+            "shed_transcripts": 0,
         }
+        for workers in (self.workers, self.asr_workers):
+            previous = workers.pop(session_id, None)
+            if previous is not None:
+                previous.cancel()
+        self.workers[session_id] = asyncio.create_task(self._transcript_worker(session_id))
+        # Other workers route this session's nudges and events here
+        try:
+            await backplane.register(session_id)
+        except Exception as e:
+            logger.error(f"Error claiming {session_id} on the backplane: {e}")
         logger.info(f"WebSocket connected: {session_id}")
+        return True
     
-    async def disconnect(self, session_id: str):
+    async def disconnect(self, session_id: str, reason: str = ""):
         """Disconnect and cleanup a WebSocket connection"""
-        if session_id in self.active_connections:
+        for workers in (self.workers, self.asr_workers):
+            worker = workers.pop(session_id, None)
+            if worker is not None and worker is not asyncio.current_task():
+                worker.cancel()
+        
+        # Unregister first, so concurrent sends and disconnects skip this socket
+        websocket = self.active_connections.pop(session_id, None)
+        self.codecs.pop(session_id, None)
+        if websocket is not None:
             try:
-                await self.active_connections[session_id].close()
+                await backplane.unregister(session_id)
+            except Exception as e:
+                logger.error(f"Error releasing {session_id} on the backplane: {e}")
+            try:
+                await asyncio.wait_for(websocket.close(reason=reason), settings.WEBSOCKET_SEND_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"Timed out closing websocket for {session_id}")
             except Exception as e:
                 logger.error(f"Error closing websocket: {e}")
-            
-            del self.active_connections[session_id]
         
         # Cleanup session data (privacy-first)
         if session_id in self.session_data:
@@ -53,40 +140,216 @@ class WebSocketManager:
         logger.info(f"WebSocket disconnected: {session_id}")
     
     async def disconnect_all(self):
-        """Disconnect all active WebSocket connections"""
-        session_ids = list(self.active_connections.keys())
-        for session_id in session_ids:
-            await self.disconnect(session_id)
+        """Disconnect all active WebSocket connections concurrently"""
+        await self._fan_out(self.disconnect, list(self.active_connections.keys()))
+    
+    async def _fan_out(self, action, session_ids: List[str]):
+        """
+        Run action for every session concurrently, at most
+        WEBSOCKET_FANOUT_CONCURRENCY at a time, so one slow client never
+        holds up the others
+        """
+        semaphore = asyncio.Semaphore(settings.WEBSOCKET_FANOUT_CONCURRENCY)
+        
+        async def bounded(session_id: str):
+            async with semaphore:
+                await action(session_id)
+        
+        results = await asyncio.gather(*[bounded(s) for s in session_ids], return_exceptions=True)
+        for session_id, result in zip(session_ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error in fan-out to {session_id}: {result}")
+    
+    async def receive_message(self, websocket: WebSocket, session_id: str) -> Optional[Dict]:
+        """
+        Receive and decode the next text or binary frame
+        Returns None for a frame that could not be decoded
+        """
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        
+        # Any frame, including a heartbeat reply, shows the socket is alive
+        session = self.session_data.get(session_id)
+        if session is not None:
+            session["last_seen"] = time.monotonic()
+        
+        try:
+            return decode_message(self.codecs.get(session_id, JSONCodec()), message)
+        except ProtocolError as e:
+            logger.warning(f"Bad frame from {session_id}: {e}")
+            await self.send_message(session_id, {
+                "type": "error",
+                "message": "Malformed message",
+            })
+            return None
     
     async def send_message(self, session_id: str, message: Dict):
-        """Send a message to a specific session"""
+        """
+        Send a message to a specific session
+        A client that does not take the message within WEBSOCKET_SEND_TIMEOUT_SECONDS is evicted
+        """
         if session_id in self.active_connections:
             try:
-                await self.active_connections[session_id].send_json(message)
+                codec = self.codecs.get(session_id, JSONCodec())
+                await asyncio.wait_for(
+                    codec.send(self.active_connections[session_id], message),
+                    settings.WEBSOCKET_SEND_TIMEOUT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Send to {session_id} timed out, evicting slow client")
+                await self.disconnect(session_id)
             except Exception as e:
                 logger.error(f"Error sending message to {session_id}: {e}")
                 await self.disconnect(session_id)
     
-    async def broadcast(self, message: Dict):
-        """Broadcast a message to all connected sessions"""
-        for session_id in list(self.active_connections.keys()):
+    async def deliver(self, session_id: str, message: Dict) -> bool:
+        """
+        Send a message to a session held by any worker
+        Returns False if no worker holds a socket for the session
+        """
+        if session_id in self.active_connections:
+            self._touch(session_id)
             await self.send_message(session_id, message)
+            return True
+        return await self._route(session_id, {"action": "send", "message": message})
+    
+    async def close_session(self, session_id: str) -> bool:
+        """Close a session's socket on whichever worker holds it"""
+        if session_id in self.active_connections:
+            await self.disconnect(session_id)
+            return True
+        return await self._route(session_id, {"action": "close"})
+    
+    async def _route(self, session_id: str, command: Dict) -> bool:
+        try:
+            return await backplane.send(session_id, command)
+        except Exception as e:
+            logger.error(f"Error routing {command['action']} to {session_id}: {e}")
+            return False
+    
+    async def handle_backplane_command(self, session_id: str, command: Dict):
+        """Run a command routed here from another worker"""
+        if session_id not in self.active_connections:
+            return
+        action = command.get("action")
+        if action == "send":
+            self._touch(session_id)
+            await self.send_message(session_id, command["message"])
+        elif action == "violations":
+            await self._nudge(
+                session_id, command["violations"], command["timestamp"], command.get("segment_id"),
+            )
+        elif action == "close":
+            await self.disconnect(session_id)
+        else:
+            logger.warning(f"Unknown backplane action for {session_id}: {action}")
+    
+    async def broadcast(self, message: Dict):
+        """Broadcast a message to all connected sessions concurrently"""
+        await self._fan_out(
+            lambda session_id: self.send_message(session_id, message),
+            list(self.active_connections.keys()),
+        )
+    
+    async def start_heartbeat(self):
+        """Start the background heartbeat and reaper task"""
+        if self._heartbeat is None and settings.WEBSOCKET_HEARTBEAT_SECONDS > 0:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+    
+    async def stop_heartbeat(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+    
+    async def _heartbeat_loop(self):
+        """
+        Every WEBSOCKET_HEARTBEAT_SECONDS, reap idle (and, if enabled, silent)
+        sessions, then heartbeat the rest; a client that cannot take the
+        heartbeat is evicted by send_message
+        """
+        while True:
+            await asyncio.sleep(settings.WEBSOCKET_HEARTBEAT_SECONDS)
+            try:
+                await self.reap_sessions()
+                await self.broadcast({
+                    "type": "heartbeat",
+                    "timestamp": datetime.utcnow().timestamp(),
+                })
+            except Exception as e:
+                logger.error(f"Error in WebSocket heartbeat: {e}")
+    
+    async def reap_sessions(self) -> int:
+        """
+        Close sessions that have had no audio, transcripts or nudges for
+        WEBSOCKET_IDLE_TIMEOUT_SECONDS, and free their buffers. With
+        WEBSOCKET_DEAD_AFTER_SECONDS set, sockets that have sent no frame at
+        all for that long are closed too; this is opt-in, since clients that
+        only receive nudges never send anything. Returns how many sessions
+        were reaped.
+        """
+        now = time.monotonic()
+        dead_after = settings.WEBSOCKET_DEAD_AFTER_SECONDS
+        dead = []
+        idle = []
+        for session_id, session in list(self.session_data.items()):
+            if dead_after > 0 and now - session["last_seen"] > dead_after:
+                dead.append(session_id)
+            elif now - session["last_activity"] > settings.WEBSOCKET_IDLE_TIMEOUT_SECONDS:
+                idle.append(session_id)
+        
+        if not dead and not idle:
+            return 0
+        
+        await self._fan_out(lambda s: self.disconnect(s, reason="No heartbeat reply"), dead)
+        await self._fan_out(lambda s: self.disconnect(s, reason="Idle session closed"), idle)
+        sessions_reaped_total.inc("dead", amount=len(dead))
+        sessions_reaped_total.inc("idle", amount=len(idle))
+        logger.info(f"Reaped {len(dead)} dead and {len(idle)} idle WebSocket sessions")
+        return len(dead) + len(idle)
+    
+    def session_load(self) -> int:
+        """
+        Sessions holding capacity on this worker: live sockets, plus sessions
+        started recently that are still expected to connect
+        """
+        connected = set(self.active_connections)
+        return len(connected) + copilot_service.pending_session_count(connected)
+    
+    def _touch(self, session_id: str):
+        """Record audio, transcript or delivered nudge activity, which keeps a session from idling out"""
+        session = self.session_data.get(session_id)
+        if session is not None:
+            session["last_activity"] = time.monotonic()
     
     async def handle_audio_chunk(self, session_id: str, data: Dict):
         """
         Handle incoming audio chunk
         Process for transcription and compliance checking
         """
+        self._touch(session_id)
         try:
             audio_data = data.get("audio")
             timestamp = data.get("timestamp", datetime.utcnow().timestamp())
             
-            # Process audio (transcription)
-            # In production, this would use Wispr Flow or similar
-            # For now, we'll expect pre-transcribed text
+            # Binary frames carry a memoryview; legacy JSON messages carry base64
+            if isinstance(audio_data, str):
+                audio_data = base64.b64decode(audio_data, validate=True)
             
-            logger.debug(f"Received audio chunk for {session_id}")
+            # Reorder through the jitter buffer, then decode, resample and VAD-gate
+            session = self.session_data.get(session_id)
+            if audio_data and session is not None:
+                jitter = session["jitter"]
+                before = jitter.stats()
+                chunks = jitter.push(audio_data, timestamp, data.get("sequence"))
+                for outcome, count in jitter.stats().items():
+                    if count > before[outcome]:
+                        audio_chunks_total.inc(outcome, amount=count - before[outcome])
+                await self._process_audio(session_id, chunks)
             
+            logger.debug(f"Received audio chunk for {session_id} (seq {data.get('sequence')})")
+        
         except Exception as e:
             logger.error(f"Error handling audio chunk: {e}")
             await self.send_message(session_id, {
@@ -94,55 +357,207 @@ class WebSocketManager:
                 "message": "Failed to process audio",
             })
     
-    async def handle_transcript(self, session_id: str, data: Dict):
+    async def _process_audio(self, session_id: str, chunks: List):
+        """Run in-order (timestamp, audio) chunks through the front-end and endpointer"""
+        session = self.session_data.get(session_id)
+        if not chunks or session is None:
+            return
+        stream = session["audio"]
+        before = (stream.frames_total, stream.frames_voiced, stream.frames_skipped)
+        utterances = []
+        for timestamp, audio_data in chunks:
+            utterances += await self.audio_processor.utterances(
+                audio_data, stream, session["endpointer"], timestamp,
+            )
+        voiced = stream.frames_voiced - before[1]
+        skipped = stream.frames_skipped - before[2]
+        audio_frames_total.inc("speech", amount=voiced - skipped)
+        audio_frames_total.inc("other_speaker", amount=skipped)
+        audio_frames_total.inc("silence", amount=stream.frames_total - before[0] - voiced)
+        
+        for utterance in utterances:
+            await self._queue_utterance(session_id, utterance)
+    
+    async def end_audio(self, session_id: str):
+        """The client stopped streaming: finalize the utterance in progress"""
+        session = self.session_data.get(session_id)
+        if session is None:
+            return
+        await self._process_audio(session_id, session["jitter"].drain())
+        utterance = session["endpointer"].flush()
+        if utterance is not None:
+            await self._queue_utterance(session_id, utterance)
+    
+    async def _queue_utterance(self, session_id: str, utterance: Utterance):
+        """
+        Queue an utterance for the session's transcription worker
+        A newer partial of the same segment replaces one still waiting, so a
+        slow transcriber skips stale hypotheses instead of falling behind
+        """
+        session = self.session_data.get(session_id)
+        if session is None or not transcription_backend.enabled:
+            return
+        if session_id not in self.asr_workers:
+            self.asr_workers[session_id] = asyncio.create_task(self._asr_worker(session_id))
+        await session["asr_queue"].put(
+            utterance, key=utterance.segment_id, droppable=not utterance.is_final,
+        )
+    
+    async def _asr_worker(self, session_id: str):
+        """Transcribe a session's utterances in order and feed them to compliance checking"""
+        session = self.session_data[session_id]
+        queue = session["asr_queue"]
+        try:
+            while session_id in self.session_data:
+                utterance = await queue.get()
+                try:
+                    text = await self.audio_processor.transcribe(utterance.samples)
+                except Exception as e:
+                    logger.error(f"Transcription failed for {session_id}: {e}")
+                    continue
+                if not text:
+                    continue
+                
+                await self.enqueue_transcript(session_id, {
+                    "type": "transcript",
+                    "speaker": utterance.speaker,
+                    "text": text,
+                    "timestamp": utterance.timestamp,
+                    "segment_id": utterance.segment_id,
+                    "is_final": utterance.is_final,
+                })
+        except asyncio.CancelledError:
+            pass
+    
+    async def configure_audio(self, session_id: str, data: Dict):
+        """Apply an audio_config message: the client's capture sample rate and channel count"""
+        session = self.session_data.get(session_id)
+        if session is None:
+            return
+        try:
+            sample_rate, channels = int(data["sample_rate"]), int(data.get("channels", 1))
+            session["audio"].configure(sample_rate, channels, data.get("channel_speakers"))
+            session["jitter"].configure(sample_rate, channels)
+            logger.debug(f"Audio for {session_id}: {data['sample_rate']} Hz, {data.get('channels', 1)} channels")
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Bad audio_config from {session_id}: {e}")
+            await self.send_message(session_id, {
+                "type": "error",
+                "message": "Invalid audio_config",
+            })
+    
+    async def enqueue_transcript(self, session_id: str, data: Dict):
+        """
+        Queue a transcript segment for the session's worker
+        Partial transcripts (is_final false) supersede queued partials of the
+        same segment_id and are dropped under load; final ones wait for room
+        """
+        session = self.session_data.get(session_id)
+        if session is None:
+            return
+        self._touch(session_id)
+        
+        is_final = data.get("is_final", True)
+        segment_id = data.get("segment_id")
+        data["_received_at"] = time.monotonic()
+        queued = await session["queue"].put(data, key=segment_id, droppable=not is_final)
+        if not queued:
+            transcripts_total.inc("dropped")
+            logger.debug(f"Dropped partial transcript for {session_id}: queue full")
+    
+    async def _transcript_worker(self, session_id: str):
+        """
+        Run compliance checks for a session's queued transcripts, in order
+        Each segment is time-boxed to RESPONSE_TIMEOUT_SECONDS, counted from
+        when it was received; under overload late segments are shed rather
+        than delaying every segment behind them
+        """
+        session = self.session_data[session_id]
+        queue = session["queue"]
+        timeout = settings.RESPONSE_TIMEOUT_SECONDS
+        try:
+            while session_id in self.session_data:
+                data = await queue.get()
+                received_at = data.get("_received_at", time.monotonic())
+                transcript_queue_seconds.observe(time.monotonic() - received_at)
+                if time.monotonic() - received_at >= timeout:
+                    self._shed(session_id, "stale before checking")
+                    continue
+                
+                # The check itself is synchronous and cannot be interrupted, so
+                # handle_transcript sheds its result if it finished too late
+                await self.handle_transcript(session_id, data, received_at + timeout)
+        except asyncio.CancelledError:
+            pass
+    
+    def _shed(self, session_id: str, reason: str):
+        """Count a transcript dropped for being too old to nudge on"""
+        session = self.session_data.get(session_id)
+        if session is not None:
+            session["shed_transcripts"] += 1
+        transcripts_total.inc("shed")
+        logger.warning(f"Shedding transcript for {session_id}: {reason}")
+    
+    async def handle_transcript(self, session_id: str, data: Dict, deadline: Optional[float] = None):
         """
         Handle incoming transcript segment
         Perform real-time compliance checking
+        A result ready only after deadline (time.monotonic()) is shed before
+        any nudge state is committed
         """
         try:
             speaker = data.get("speaker", "rep")
             text = data.get("text", "")
             timestamp = data.get("timestamp", datetime.utcnow().timestamp())
+            segment_id = data.get("segment_id")
             
             logger.debug(f"Processing transcript for {session_id}: {speaker}: {text[:50]}...")
             
-            # Store in buffer (sliding window)
-            if session_id in self.session_data:
+            # Store in buffer (sliding window, evicted after WINDOW_SIZE_SECONDS for privacy)
+            # Partial transcripts are still being revised, so only final ones are kept
+            if session_id in self.session_data and data.get("is_final", True):
                 self.session_data[session_id]["transcript_buffer"].append({
                     "speaker": speaker,
                     "text": text,
                     "timestamp": timestamp,
                 })
-                
-                # Keep only last 10 segments (sliding window for privacy)
-                if len(self.session_data[session_id]["transcript_buffer"]) > 10:
-                    self.session_data[session_id]["transcript_buffer"].pop(0)
             
-            # Check for compliance violations (rep only)
+            # Check for compliance violations (rep only), carrying matches across segments
+            session = self.session_data.get(session_id)
             if speaker == "rep":
-                violations = await self.compliance_engine.check_text(text)
+                engine = await compliance_registry.get_engine()
+                # Only the global rules and the session's product rules are checked
+                context = await copilot_service.get_compliance_context(session_id)
+                check_started = time.monotonic()
+                if session is not None:
+                    # The live widget leads with the top nudge, so stop at the first critical hit
+                    violations = await engine.check_stream(
+                        session["stream"], speaker, text, context,
+                        stop_on_critical=True, segment_id=segment_id,
+                        suppressed=self._suppressed(session),
+                    )
+                else:
+                    violations = await engine.check_text(text, context, stop_on_critical=True)
+                compliance_check_seconds.observe(time.monotonic() - check_started)
                 
-                if violations:
-                    # Send nudges to the client
-                    for violation in violations:
-                        nudge = {
-                            "type": "nudge",
-                            "nudge_id": f"{session_id}_{timestamp}",
-                            "timestamp": timestamp,
-                            "severity": violation["severity"],
-                            "icon": self._get_severity_icon(violation["severity"]),
-                            "title": violation["rule_name"],
-                            "message": violation["message"],
-                            "suggested_response": violation.get("suggested_response"),
-                            "regulation_reference": violation.get("regulation_reference"),
-                        }
-                        
-                        await self.send_message(session_id, nudge)
-                        
-                        # Store violation
-                        if session_id in self.session_data:
-                            self.session_data[session_id]["violations"].append(violation)
+                if deadline is not None and time.monotonic() > deadline:
+                    # Forget the rules this check reported, so a later revision can still nudge
+                    if session is not None:
+                        session["stream"].reported.difference_update(v["rule_id"] for v in violations)
+                    self._shed(session_id, f"check finished after {settings.RESPONSE_TIMEOUT_SECONDS}s")
+                    return
+            else:
+                if session is not None:
+                    session["stream"].reset()
+                violations = []
+            
+            transcripts_total.inc("checked")
+            for violation in violations:
+                violations_total.inc(violation["rule_id"], violation["severity"])
             
+            if violations:
+                await self._nudge(session_id, violations, timestamp, segment_id, data.get("_received_at"))
+        
         except Exception as e:
             logger.error(f"Error handling transcript: {e}")
             await self.send_message(session_id, {
@@ -150,6 +565,99 @@ class WebSocketManager:
                 "message": "Failed to process transcript",
             })
     
+    async def publish_violations(
+        self,
+        session_id: str,
+        violations: List[Dict],
+        timestamp: float,
+        segment_id: Optional[str] = None,
+    ) -> bool:
+        """
+        Nudge a session about violations found outside its socket (REST checks)
+        They are recorded, suppressed and ranked like streamed transcripts, on
+        whichever worker holds the session
+        Returns False if no worker holds the session
+        """
+        if session_id in self.session_data:
+            await self._nudge(session_id, violations, timestamp, segment_id)
+            return True
+        return await self._route(session_id, {
+            "action": "violations",
+            "violations": violations,
+            "timestamp": timestamp,
+            "segment_id": segment_id,
+        })
+    
+    async def _nudge(
+        self,
+        session_id: str,
+        violations: List[Dict],
+        timestamp: float,
+        segment_id: Optional[str] = None,
+        received_at: Optional[float] = None,
+    ):
+        """Record a segment's violations and send one ranked nudges frame for the fresh ones"""
+        # Store every violation, but only nudge rules not shown recently
+        session = self.session_data.get(session_id)
+        if session is not None:
+            session["violations"].extend(violations)
+            violations = self._unsuppressed(session, violations)
+        violations = sorted(violations, key=lambda v: SEVERITY_PRIORITY.get(v["severity"], 999))
+        
+        nudges = [
+            {
+                "nudge_id": f"{session_id}_{timestamp}_{violation['rule_id']}",
+                "rule_id": violation["rule_id"],
+                "timestamp": timestamp,
+                "severity": violation["severity"],
+                "icon": self._get_severity_icon(violation["severity"]),
+                "title": violation["rule_name"],
+                "message": violation["message"],
+                "suggested_response": violation.get("suggested_response"),
+                "regulation_reference": violation.get("regulation_reference"),
+            }
+            for violation in violations
+        ]
+        if not nudges:
+            return
+        
+        # One frame per segment, most severe nudge first
+        send_started = time.monotonic()
+        await self.send_message(session_id, {
+            "type": "nudges",
+            "timestamp": timestamp,
+            "segment_id": segment_id,
+            "nudges": nudges,
+        })
+        sent = time.monotonic()
+        nudge_send_seconds.observe(sent - send_started)
+        if received_at is not None:
+            nudge_latency_seconds.observe(sent - received_at)
+        for nudge in nudges:
+            nudges_total.inc(nudge["severity"])
+    
+    def _suppressed(self, session: Dict) -> Set[str]:
+        """
+        Rule ids nudged within the suppression window
+        Uses a monotonic clock, so client timestamps cannot skew the window
+        """
+        cutoff = time.monotonic() - settings.NUDGE_SUPPRESSION_SECONDS
+        return {rule_id for rule_id, nudged_at in session["last_nudged"].items() if nudged_at > cutoff}
+    
+    def _unsuppressed(self, session: Dict, violations: List[Dict]) -> List[Dict]:
+        """Drop violations whose rule was nudged within the suppression window"""
+        suppressed = self._suppressed(session)
+        now = time.monotonic()
+        
+        fresh = []
+        for violation in violations:
+            rule_id = violation["rule_id"]
+            if rule_id in suppressed:
+                continue
+            session["last_nudged"][rule_id] = now
+            fresh.append(violation)
+        return fresh
+    
     def _get_severity_icon(self, severity: str) -> str:
         """Get emoji icon for severity level"""
         icons = {
@@ -170,6 +678,14 @@ class WebSocketManager:
             "transcript_segments": len(data["transcript_buffer"]),
             "violations_detected": len(data["violations"]),
             "is_connected": session_id in self.active_connections,
+            "queued_transcripts": len(data["queue"]),
+            "coalesced_transcripts": data["queue"].coalesced,
+            "dropped_transcripts": data["queue"].dropped,
+            "shed_transcripts": data["shed_transcripts"],
+            "audio_frames": data["audio"].frames_total,
+            "voiced_audio_frames": data["audio"].frames_voiced,
+            "skipped_audio_frames": data["audio"].frames_skipped,
+            "jitter_buffer": data["jitter"].stats(),
         }
 
 
@@ -0,0 +1,116 @@
+"""
+WebSocket Protocol - Binary audio framing and negotiated message encodings
+Audio chunks travel as raw binary frames instead of base64 inside JSON
+"""
+
+from typing import Dict, List, Optional
+from fastapi import WebSocket
+import json
+import struct
+
+import msgpack
+
+
+# Binary frame header: frame type, flags, sequence number, timestamp (seconds)
+FRAME_HEADER = struct.Struct("!BBId")
+
+FRAME_AUDIO_CHUNK = 0x01
+
+FRAME_TYPES = {
+    FRAME_AUDIO_CHUNK: "audio_chunk",
+}
+
+# WebSocket subprotocols a client can request, most compact first
+SUBPROTOCOL_MSGPACK = "veritas.msgpack.v1"
+SUBPROTOCOL_JSON = "veritas.json.v1"
+
+
+class ProtocolError(ValueError):
+    """A WebSocket frame could not be decoded"""
+
+
+def encode_audio_frame(sequence: int, timestamp: float, payload: bytes, flags: int = 0) -> bytes:
+    """Build a binary audio_chunk frame (used by clients and load tools)"""
+    return FRAME_HEADER.pack(FRAME_AUDIO_CHUNK, flags, sequence, timestamp) + payload
+
+
+def decode_binary_frame(frame: bytes) -> Dict:
+    """
+    Decode a binary frame into a message
+    The payload is a memoryview over the received frame, so it is not copied
+    """
+    if len(frame) < FRAME_HEADER.size:
+        raise ProtocolError(f"Binary frame too short: {len(frame)} bytes")
+    
+    frame_type, flags, sequence, timestamp = FRAME_HEADER.unpack_from(frame)
+    message_type = FRAME_TYPES.get(frame_type)
+    if message_type is None:
+        raise ProtocolError(f"Unknown binary frame type: {frame_type:#04x}")
+    
+    return {
+        "type": message_type,
+        "flags": flags,
+        "sequence": sequence,
+        "timestamp": timestamp,
+        "audio": memoryview(frame)[FRAME_HEADER.size:],
+    }
+
+
+class JSONCodec:
+    """Control and nudge messages as JSON text frames (the default)"""
+    
+    subprotocol: Optional[str] = None
+    
+    async def send(self, websocket: WebSocket, message: Dict):
+        await websocket.send_text(json.dumps(message))
+    
+    def decode_bytes(self, frame: bytes) -> Dict:
+        return decode_binary_frame(frame)
+
+
+class MsgpackCodec(JSONCodec):
+    """
+    Control and nudge messages as MessagePack binary frames
+    Binary audio frames are told apart by their first byte, which is never a
+    valid start for the MessagePack map every message is encoded as
+    """
+    
+    subprotocol = SUBPROTOCOL_MSGPACK
+    
+    async def send(self, websocket: WebSocket, message: Dict):
+        await websocket.send_bytes(msgpack.packb(message))
+    
+    def decode_bytes(self, frame: bytes) -> Dict:
+        if frame and frame[0] in FRAME_TYPES:
+            return decode_binary_frame(frame)
+        try:
+            message = msgpack.unpackb(frame)
+        except (ValueError, msgpack.UnpackException) as e:
+            raise ProtocolError(f"Invalid MessagePack frame: {e}") from e
+        if not isinstance(message, dict):
+            raise ProtocolError("MessagePack frame is not a map")
+        return message
+
+
+def negotiate_codec(requested: List[str]) -> JSONCodec:
+    """Pick the message encoding from the client's requested subprotocols"""
+    if SUBPROTOCOL_MSGPACK in requested:
+        return MsgpackCodec()
+    codec = JSONCodec()
+    if SUBPROTOCOL_JSON in requested:
+        codec.subprotocol = SUBPROTOCOL_JSON
+    return codec
+
+
+def decode_message(codec: JSONCodec, message: Dict) -> Dict:
+    """Decode a raw ASGI websocket.receive message into a protocol message"""
+    if message.get("bytes") is not None:
+        return codec.decode_bytes(message["bytes"])
+    
+    try:
+        data = json.loads(message.get("text") or "")
+    except ValueError as e:
+        raise ProtocolError(f"Invalid JSON frame: {e}") from e
+    if not isinstance(data, dict):
+        raise ProtocolError("JSON frame is not an object")
+    return data
@@ -0,0 +1,9 @@
+"""
+Shared test setup
+Tests import services the way the app does, from the backend directory
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,40 @@
+"""
+Tests for per-channel speaker attribution in the audio front-end
+"""
+
+import numpy as np
+
+from config import settings
+from services.audio_processor import AudioStream
+
+FRAME_SAMPLES = settings.AUDIO_SAMPLE_RATE * settings.AUDIO_VAD_FRAME_MS // 1000
+
+
+def _stereo(left: np.ndarray, right: np.ndarray) -> bytes:
+    return np.stack((left, right), axis=1).astype("<i2").tobytes()
+
+
+def _speakers(stream, data):
+    return [speaker for _, _, _, speaker in stream.frames(data)]
+
+
+def test_two_channels_downmix_without_speakers():
+    stream = AudioStream()
+    stream.configure(settings.AUDIO_SAMPLE_RATE, 2)
+    assert stream.speakers is None
+    assert set(_speakers(stream, bytes(FRAME_SAMPLES * 4))) == {None}
+
+
+def test_silence_does_not_hand_the_turn_to_the_last_channel():
+    stream = AudioStream()
+    stream.configure(settings.AUDIO_SAMPLE_RATE, 2, ["rep", "doctor"])
+    tone = (3000 * np.sin(np.arange(FRAME_SAMPLES * 3) / 5)).astype(np.int16)
+    silence = np.zeros(FRAME_SAMPLES * 2, dtype=np.int16)
+    
+    assert _speakers(stream, _stereo(silence, silence)) == ["rep", "rep"]
+    # Equal energy on both channels is cross-talk: the rep keeps the turn
+    assert _speakers(stream, _stereo(tone, tone)) == ["rep"] * 3
+    
+    quiet = tone // 4
+    assert _speakers(stream, _stereo(quiet, tone)) == ["doctor"] * 3
+    assert _speakers(stream, _stereo(silence, silence)) == ["doctor", "doctor"]
@@ -0,0 +1,43 @@
+"""
+Tests for utterance endpointing over VAD frames
+"""
+
+import numpy as np
+
+from config import settings
+from services.endpointer import Endpointer
+
+FRAME = np.ones(settings.AUDIO_SAMPLE_RATE * settings.AUDIO_VAD_FRAME_MS // 1000, dtype=np.int16)
+PADDING_FRAMES = settings.AUDIO_VAD_PADDING_MS // settings.AUDIO_VAD_FRAME_MS
+
+
+def _run(endpointer, speech_frames, padding_frames=PADDING_FRAMES):
+    """Push speech followed by VAD hangover and silence; returns the final utterances"""
+    pushed = [(True, False)] * speech_frames + [(True, True)] * padding_frames + [(False, False)] * endpointer.silence_frames
+    utterances = [endpointer.push(FRAME, voiced, 0.0, padded=padded) for voiced, padded in pushed]
+    return [utterance for utterance in utterances if utterance is not None and utterance.is_final]
+
+
+def test_click_with_hangover_is_dropped():
+    endpointer = Endpointer("s")
+    # Hangover alone is longer than the minimum, so only voiced frames may count
+    assert PADDING_FRAMES >= endpointer.min_frames
+    assert _run(endpointer, 1) == []
+    assert endpointer.utterances == 0
+
+
+def test_speech_at_minimum_is_kept_with_padding():
+    endpointer = Endpointer("s")
+    finals = _run(endpointer, endpointer.min_frames)
+    assert len(finals) == 1
+    assert len(finals[0].samples) == (endpointer.min_frames + PADDING_FRAMES) * len(FRAME)
+    assert finals[0].segment_id == "s-u0"
+
+
+def test_flush_drops_short_burst():
+    endpointer = Endpointer("s")
+    for _ in range(endpointer.min_frames - 1):
+        endpointer.push(FRAME, True, 0.0)
+    for _ in range(PADDING_FRAMES):
+        endpointer.push(FRAME, True, 0.0, padded=True)
+    assert endpointer.flush() is None
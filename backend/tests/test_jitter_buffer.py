@@ -0,0 +1,79 @@
+"""
+Tests for audio chunk reordering in the jitter buffer
+"""
+
+from services.jitter_buffer import JitterBuffer
+
+RATE = 16000
+CHUNK_SECONDS = 0.1
+
+
+def _chunk(index: int) -> bytes:
+    # 100 ms of mono PCM16, tagged so released chunks can be told apart
+    return bytes([index % 256]) * int(RATE * CHUNK_SECONDS * 2)
+
+
+def _push(buffer, index, now=0.0, sequence=True):
+    released = buffer.push(_chunk(index), index * CHUNK_SECONDS, index if sequence else None, now=now)
+    return [(round(timestamp, 3), bytes(audio[:1]), len(audio)) for timestamp, audio in released]
+
+
+def test_in_order_chunks_pass_straight_through():
+    buffer = JitterBuffer(RATE)
+    assert [chunk[0] for chunk in _push(buffer, 0) + _push(buffer, 1) + _push(buffer, 2)] == [0.0, 0.1, 0.2]
+    assert len(buffer) == 0
+
+
+def test_out_of_order_chunk_is_put_back_in_place():
+    buffer = JitterBuffer(RATE)
+    _push(buffer, 0)
+    assert _push(buffer, 2, now=0.01) == []
+    assert [chunk[0] for chunk in _push(buffer, 1, now=0.02)] == [0.1, 0.2]
+    assert buffer.stats()["reordered"] == 1
+
+
+def test_duplicates_and_late_chunks_are_dropped():
+    buffer = JitterBuffer(RATE)
+    _push(buffer, 0)
+    _push(buffer, 1)
+    assert _push(buffer, 1) == []
+    assert _push(buffer, 0) == []
+    stats = buffer.stats()
+    assert (stats["duplicate"], stats["late"]) == (0, 2)
+    
+    _push(buffer, 3, now=0.01)
+    assert _push(buffer, 3, now=0.02) == []
+    assert buffer.stats()["duplicate"] == 1
+
+
+def test_short_gap_is_filled_with_silence_after_the_target_wait():
+    buffer = JitterBuffer(RATE)
+    _push(buffer, 0)
+    assert _push(buffer, 2, now=0.01) == []
+    released = _push(buffer, 3, now=0.01 + 2 * buffer.target)
+    assert released == [
+        (0.1, b"\x00", len(_chunk(1))),
+        (0.2, b"\x02", len(_chunk(2))),
+        (0.3, b"\x03", len(_chunk(3))),
+    ]
+    assert buffer.stats()["gap_filled"] == 1
+
+
+def test_long_gap_is_skipped():
+    buffer = JitterBuffer(RATE)
+    _push(buffer, 0)
+    gap_chunks = int(buffer.max_gap / CHUNK_SECONDS) + 1
+    _push(buffer, 1 + gap_chunks, now=0.01)
+    released = buffer.drain()
+    assert [round(timestamp, 3) for timestamp, _ in released] == [round((1 + gap_chunks) * CHUNK_SECONDS, 3)]
+    assert buffer.stats()["gap_skipped"] == 1
+
+
+def test_chunks_without_sequence_are_ordered_by_timestamp():
+    buffer = JitterBuffer(RATE)
+    # Without sequence numbers even the first chunk waits for stragglers
+    assert _push(buffer, 1, sequence=False) == []
+    assert _push(buffer, 0, now=0.01, sequence=False) == []
+    assert _push(buffer, 3, now=0.02, sequence=False) == []
+    released = _push(buffer, 2, now=0.02 + 2 * buffer.target, sequence=False)
+    assert [chunk[0] for chunk in released] == [0.0, 0.1, 0.2, 0.3]
@@ -0,0 +1,47 @@
+"""
+Tests for scoping compliance checks to a session's product focus
+"""
+
+from services.compliance_engine import ComplianceRule, RuleSet
+from services.rule_matcher import MAX_DIRECT_CHECKS
+
+
+def _rule(rule_id, pattern, products=None):
+    return ComplianceRule(
+        rule_id=rule_id, name=rule_id, category="test", patterns=[pattern],
+        severity="warning", message=rule_id, products=products,
+    )
+
+
+RULES = [
+    _rule("global_cure", r"\bcures? everything"),
+    _rule("glucora_weight", r"\bweight loss", products=["Glucora"]),
+    _rule("cardiva_weight", r"\bweight loss", products=[" CARDIVA "]),
+]
+
+TEXT = "It cures everything, even weight loss"
+
+
+def _ids(matcher, text=TEXT):
+    return [rule.rule_id for rule in matcher.match(text)]
+
+
+def test_product_focus_checks_global_and_product_rules():
+    rules = RuleSet(RULES)
+    assert _ids(rules.matcher_for("glucora")) == ["global_cure", "glucora_weight"]
+    assert _ids(rules.matcher_for("Cardiva")) == ["global_cure", "cardiva_weight"]
+
+
+def test_unknown_or_missing_product():
+    rules = RuleSet(RULES)
+    assert _ids(rules.matcher_for("Unlisted")) == ["global_cure"]
+    assert _ids(rules.matcher_for(None)) == ["global_cure", "glucora_weight", "cardiva_weight"]
+
+
+def test_full_scan_keeps_only_the_product_rules():
+    # Enough candidates that the product matcher takes the shared full scan
+    filler = [_rule(f"filler_{i}", rf"\bweight loss {i}\b") for i in range(MAX_DIRECT_CHECKS)]
+    rules = RuleSet(RULES + filler)
+    text = TEXT + " 7"
+    assert _ids(rules.matcher_for("glucora"), text) == ["global_cure", "glucora_weight", "filler_7"]
+    assert _ids(rules.matcher_for("unlisted"), text) == ["global_cure", "filler_7"]
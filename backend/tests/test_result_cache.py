@@ -0,0 +1,89 @@
+"""
+Tests for the compliance result cache
+"""
+
+from services.compliance_engine import ComplianceEngine, ComplianceRule
+from services.result_cache import ResultCache, normalize_text
+
+
+def _rule(rule_id, pattern, severity="warning"):
+    return ComplianceRule(
+        rule_id=rule_id, name=rule_id, category="test", patterns=[pattern],
+        severity=severity, message=rule_id,
+    )
+
+
+def _engine(rules):
+    engine = ComplianceEngine()
+    engine.cache = ResultCache(16)
+    engine.replace_rules(rules)
+    return engine
+
+
+def test_evicts_least_recently_used():
+    cache = ResultCache(2)
+    cache.put("a", ())
+    cache.put("b", ())
+    assert cache.get("a") == ()
+    cache.put("c", ())
+    assert cache.get("b") is None
+    assert cache.get("a") == () and cache.get("c") == ()
+    assert cache.stats()["entries"] == 2
+
+
+def test_counts_hits_and_misses():
+    cache = ResultCache(4)
+    assert cache.get("a") is None
+    cache.put("a", ())
+    cache.get("a")
+    cache.get("a")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_rate"] == 2 / 3
+
+
+def test_zero_size_disables_cache():
+    cache = ResultCache(0)
+    cache.put("a", ())
+    assert cache.get("a") is None
+
+
+def test_normalized_text_shares_an_entry():
+    assert normalize_text("  It  Cures\teverything ") == "it cures everything"
+    engine = _engine([_rule("cure", r"\bcures everything")])
+    ruleset = engine.ruleset
+    assert [r.rule_id for r in engine._match_cached(ruleset, "It cures everything")] == ["cure"]
+    assert [r.rule_id for r in engine._match_cached(ruleset, "IT  CURES everything")] == ["cure"]
+    assert (engine.cache.hits, engine.cache.misses) == (1, 1)
+
+
+def test_products_are_cached_separately():
+    engine = _engine([_rule("cure", r"\bcures everything")])
+    engine._match_cached(engine.ruleset, "it cures everything", "glucora")
+    engine._match_cached(engine.ruleset, "it cures everything", "cardiva")
+    assert engine.cache.stats()["entries"] == 2
+
+
+def test_results_cut_short_are_not_cached():
+    engine = _engine([
+        _rule("guarantee", r"\bguaranteed", severity="critical"),
+        _rule("cure", r"\bcures everything"),
+    ])
+    text = "guaranteed, it cures everything"
+    stopped = engine._match_cached(engine.ruleset, text, stop_on_critical=True)
+    assert [r.rule_id for r in stopped] == ["guarantee"]
+    assert engine.cache.stats()["entries"] == 0
+    full = engine._match_cached(engine.ruleset, text)
+    assert [r.rule_id for r in full] == ["guarantee", "cure"]
+    # A cached full result still honours stop_on_critical
+    again = engine._match_cached(engine.ruleset, text, stop_on_critical=True)
+    assert [r.rule_id for r in again] == ["guarantee"]
+    assert engine.cache.hits == 1
+
+
+def test_new_rule_set_is_not_served_old_results():
+    engine = _engine([_rule("cure", r"\bcures everything")])
+    engine._match_cached(engine.ruleset, "it cures everything")
+    engine.replace_rules([_rule("other", r"\bno risk")])
+    assert engine.cache.stats()["entries"] == 0
+    assert engine._match_cached(engine.ruleset, "it cures everything") == ()
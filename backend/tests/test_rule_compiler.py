@@ -0,0 +1,147 @@
+"""
+Tests for the rule compiler's possessive rewrite, risk analysis and slow-path search
+"""
+
+import random
+import re
+import time
+
+import pytest
+
+from services.compliance_engine import ComplianceEngine, ComplianceRule
+from services.rule_compiler import (
+    RISK_EXPONENTIAL,
+    RISK_LINEAR,
+    RISK_POLYNOMIAL,
+    SLOW_PATH_WINDOW_CHARS,
+    compile_pattern,
+    windowed_search,
+)
+
+
+# Patterns whose greedy repeats the compiler makes possessive
+REWRITTEN_PATTERNS = [
+    r"a+b",
+    r"[0-9]+%",
+    r"(um+|uh+|er+){2,}",
+    r"x[ab]*y",
+    r"(?:ab+)+c",
+    r"(?P<dose>[0-9]+) ?mg",
+    r"b*a+",
+]
+
+# Patterns that must be left alone, since giving characters back can matter
+KEPT_PATTERNS = [
+    r"a*a",
+    r"[ab]+b",
+    r"(a|ab)+c",
+    r"x.*y",
+]
+
+ALPHABET = "abxy0129% mgcuher"
+
+
+def _inputs(count: int = 3000, seed: int = 7):
+    rng = random.Random(seed)
+    yield ""
+    for _ in range(count):
+        yield "".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, 24)))
+
+
+def _default_patterns():
+    return [source for rule in ComplianceEngine()._load_default_rules() for source in
+            (c.source for c in rule.compiled_patterns)]
+
+
+@pytest.mark.parametrize("source", REWRITTEN_PATTERNS)
+def test_possessive_rewrite_applies(source):
+    assert compile_pattern(source).rewritten
+
+
+@pytest.mark.parametrize("source", KEPT_PATTERNS)
+def test_possessive_rewrite_skips_overlapping_follow(source):
+    assert not compile_pattern(source).rewritten
+
+
+@pytest.mark.parametrize("source", REWRITTEN_PATTERNS + KEPT_PATTERNS)
+def test_rewrite_matches_same_inputs(source):
+    original = re.compile(source, re.IGNORECASE)
+    compiled = compile_pattern(source).regex
+    for text in _inputs():
+        expected = original.search(text)
+        actual = compiled.search(text)
+        assert (expected and expected.span()) == (actual and actual.span()), text
+        if expected:
+            assert expected.groups() == actual.groups(), text
+
+
+def test_default_rules_match_same_inputs():
+    phrases = [
+        "This drug can help with weight loss in your patients.",
+        "This medication is 100% effective and always works.",
+        "Don't worry about side effects, they're minimal.",
+        "Um, uh, er, I think maybe it works, but I'm not sure...",
+        "In clinical trials, 78% of patients achieved a 1.5% reduction in A1C.",
+        "It is better than metformin in the head to head trial.",
+        "I'll give you a rebate for prescribing it.",
+        "It's safe to use during pregnancy, not approved for weight loss.",
+    ]
+    for source in _default_patterns():
+        original = re.compile(source, re.IGNORECASE)
+        compiled = compile_pattern(source).regex
+        for text in phrases:
+            expected = original.search(text)
+            actual = compiled.search(text)
+            assert (expected and expected.span()) == (actual and actual.span()), (source, text)
+
+
+@pytest.mark.parametrize("source, risk", [
+    (r"guaranteed (results|to work)", RISK_LINEAR),
+    (r"a+b", RISK_LINEAR),
+    (r"(um+|uh+|er+){2,}", RISK_LINEAR),
+    (r"(a+)+b", RISK_EXPONENTIAL),
+    (r"(\w+\s?)*$", RISK_EXPONENTIAL),
+    (r"\w+\s+\w+", RISK_POLYNOMIAL),
+    (r"x\d+\d+y", RISK_POLYNOMIAL),
+    (r"better than (?!.*trial)", RISK_POLYNOMIAL),
+    (r"(a|a)+b", RISK_EXPONENTIAL),
+    (r"(a|aa)+b", RISK_EXPONENTIAL),
+    (r"dose of (\d|\d\d)+ mg!", RISK_EXPONENTIAL),
+    (r"(x|y|xy)+z", RISK_EXPONENTIAL),
+    (r"(a|ab)+c", RISK_LINEAR),
+    (r"(?:the |a )+drug", RISK_LINEAR),
+])
+def test_risk_classification(source, risk):
+    assert compile_pattern(source).risk == risk
+
+
+def test_risks_name_the_cause():
+    reasons = compile_pattern(r"better than (?!.*trial)").reasons
+    assert reasons == ["polynomial: unbounded repeat inside a lookaround"]
+
+
+def test_overlapping_alternation_does_not_block_checks():
+    rule = ComplianceRule(
+        rule_id="dose_001", name="Dose", category="dosing",
+        patterns=[r"dose of (\d|\d\d)+ mg!"], severity="warning", message="Dose",
+    )
+    assert rule.unsafe_patterns == [r"dose of (\d|\d\d)+ mg!"]
+    
+    started = time.perf_counter()
+    assert not rule.check("a dose of " + "1" * 36 + " mg")
+    assert time.perf_counter() - started < 0.05
+
+
+def test_negative_lookahead_sees_past_the_window():
+    regex = compile_pattern(r"this drug can help (?!.*approved)").regex
+    filler = "x" * (SLOW_PATH_WINDOW_CHARS + 230)
+    assert windowed_search(regex, f"This drug can help {filler} as approved by the FDA.") is None
+    assert windowed_search(regex, f"This drug can help {filler} with weight loss.") is not None
+
+
+def test_lookahead_match_found_after_earlier_candidates():
+    regex = compile_pattern(r"better than (?!.*trial)").regex
+    text = "better than the trial. " * 40 + "It is better than anything."
+    m = windowed_search(regex, text)
+    assert m is not None and m.start() == text.rindex("better than")
+    assert windowed_search(regex, "better than placebo. " * 40 + "see the trial") is None
@@ -0,0 +1,90 @@
+"""
+Tests for rule pack loading and its on-disk analysis cache
+"""
+
+import json
+
+import pytest
+
+from services import rule_packs
+from services.compliance_engine import RuleSet
+from services.rule_packs import RulePackError, load_rule_pack
+
+
+RULES = [
+    {
+        "rule_id": "pack_001",
+        "name": "Cure claim",
+        "category": "efficacy",
+        "patterns": [r"\bcures? (diabetes|everything)\b"],
+        "severity": "critical",
+        "message": "Avoid cure claims",
+    },
+    {
+        "rule_id": "pack_002",
+        "name": "Dosing",
+        "category": "off_label",
+        "patterns": [r"double the dose"],
+        "severity": "warning",
+        "message": "Stay on label",
+        "products": ["Glucora"],
+    },
+]
+
+
+@pytest.fixture
+def pack(tmp_path):
+    path = tmp_path / "pack.json"
+    path.write_text(json.dumps({"rules": RULES}))
+    return path
+
+
+def _no_compile(*args, **kwargs):
+    raise AssertionError("pattern analysed despite a cache hit")
+
+
+def test_second_load_uses_the_cache(pack, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    first = load_rule_pack(pack, cache_dir)
+    assert len(list(cache_dir.iterdir())) == 1
+    
+    monkeypatch.setattr(rule_packs, "compile_pattern", _no_compile)
+    second = load_rule_pack(pack, cache_dir)
+    assert [rule.rule_id for rule in second] == [rule.rule_id for rule in first]
+    assert second[1].products == ["glucora"]
+    assert RuleSet(second).matcher.match_ids("It cures diabetes") == ["pack_001"]
+
+
+def test_changed_pack_misses_the_cache(pack, tmp_path):
+    cache_dir = tmp_path / "cache"
+    load_rule_pack(pack, cache_dir)
+    pack.write_text(json.dumps({"rules": RULES[:1]}))
+    assert [rule.rule_id for rule in load_rule_pack(pack, cache_dir)] == ["pack_001"]
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: data["rules"][0].pop("definition"),
+    lambda data: data["rules"][0].update(compiled=[None]),
+    lambda data: data["rules"][0]["compiled"][0].update(compiled_source="(unclosed"),
+    lambda data: data.update(rules=42),
+])
+def test_malformed_cache_entry_is_a_miss(pack, tmp_path, corrupt):
+    cache_dir = tmp_path / "cache"
+    load_rule_pack(pack, cache_dir)
+    [cache_file] = cache_dir.iterdir()
+    data = json.loads(cache_file.read_text())
+    corrupt(data)
+    cache_file.write_text(json.dumps(data))
+    
+    rules = load_rule_pack(pack, cache_dir)
+    assert [rule.rule_id for rule in rules] == ["pack_001", "pack_002"]
+    # The rebuilt analysis replaced the bad entry
+    assert json.loads(cache_file.read_text())["rules"][0]["definition"]["rule_id"] == "pack_001"
+
+
+def test_invalid_pack_is_rejected(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps([dict(RULES[0], severity="urgent")]))
+    with pytest.raises(RulePackError):
+        load_rule_pack(path, tmp_path / "cache")
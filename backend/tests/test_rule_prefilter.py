@@ -0,0 +1,61 @@
+"""
+Tests for keyword extraction and the keyword prefilter index
+"""
+
+import pytest
+
+from services.compliance_engine import ComplianceRule, RuleSet
+from services.rule_prefilter import KeywordIndex, extract_keywords
+
+
+@pytest.mark.parametrize("source, keywords", [
+    # Without a leading \b the first word may be the tail of a longer one
+    (r"guaranteed (results|to work)", {"results", "work"}),
+    (r"\bguaranteed (results|to work)", {"guaranteed"}),
+    (r"\b(cures?|heals?) diabetes", {"diabetes"}),
+    (r"\bfree samples?", {"sample"}),
+    (r"\d+% effective", {"effective"}),
+    (r"x[0-9]+y", None),
+    (r".*", None),
+])
+def test_extract_keywords(source, keywords):
+    assert extract_keywords(source) == (frozenset(keywords) if keywords is not None else None)
+
+
+def _rule(rule_id, *patterns):
+    return ComplianceRule(
+        rule_id=rule_id, name=rule_id, category="test", patterns=list(patterns),
+        severity="warning", message=rule_id,
+    )
+
+
+def test_candidates_need_a_keyword_in_the_text():
+    cure = _rule("cure", r"\bcures? diabetes")
+    price = _rule("price", r"\bspecial (deal|offer)")
+    always = _rule("always", r"x[0-9]+y")
+    index = KeywordIndex([cure, price, always])
+    
+    assert index.indexed_count == 2
+    assert index.candidates("Nothing to see here") == [always]
+    assert index.candidates("It CURES Diabetes!") == [cure, always]
+    # Keywords match the start of a word, like the pattern they came from
+    assert index.candidates("a specialist will call") == [price, always]
+
+
+def test_prefilter_never_hides_a_match():
+    rules = RuleSet([
+        _rule("cure", r"\bcures? diabetes"),
+        _rule("price", r"special (deal|offer)"),
+        _rule("dose", r"\d+ ?mg twice"),
+        _rule("free", r"free samples?"),
+    ])
+    texts = [
+        "It cures diabetes",
+        "There is a special deal today",
+        "take 20mg twice a day",
+        "Free sample kits are available",
+        "special offer: it cure diabetes, 5 mg twice",
+        "nothing relevant",
+    ]
+    for text in texts:
+        assert rules.matcher.match(text) == rules.matcher.scan(text), text
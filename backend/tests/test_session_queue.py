@@ -0,0 +1,71 @@
+"""
+Tests for per-session queue coalescing and shedding
+"""
+
+import asyncio
+
+from services.session_queue import SessionQueue
+
+
+async def _drain(queue):
+    return [await queue.get() for _ in range(len(queue))]
+
+
+def test_partial_is_replaced_by_newer_revision():
+    async def run():
+        queue = SessionQueue(maxsize=8)
+        await queue.put("s1 partial 1", key="s1", droppable=True)
+        await queue.put("s2 final", key="s2")
+        await queue.put("s1 partial 2", key="s1", droppable=True)
+        await queue.put("s1 final", key="s1")
+        return queue.coalesced, await _drain(queue)
+    
+    coalesced, items = asyncio.run(run())
+    # The revision keeps the segment's place in line
+    assert items == ["s1 final", "s2 final"]
+    assert coalesced == 2
+
+
+def test_final_is_never_coalesced_away():
+    async def run():
+        queue = SessionQueue(maxsize=8)
+        await queue.put("s1 final", key="s1")
+        await queue.put("s1 late partial", key="s1", droppable=True)
+        return await _drain(queue)
+    
+    assert asyncio.run(run()) == ["s1 final", "s1 late partial"]
+
+
+def test_full_queue_evicts_oldest_partial_for_a_final():
+    async def run():
+        queue = SessionQueue(maxsize=2)
+        await queue.put("a partial", key="a", droppable=True)
+        await queue.put("b partial", key="b", droppable=True)
+        assert await queue.put("c final", key="c")
+        return queue.dropped, await _drain(queue)
+    
+    assert asyncio.run(run()) == (1, ["b partial", "c final"])
+
+
+def test_partial_is_dropped_when_only_finals_are_queued():
+    async def run():
+        queue = SessionQueue(maxsize=1)
+        await queue.put("a final", key="a")
+        accepted = await queue.put("b partial", key="b", droppable=True)
+        return accepted, queue.dropped, await _drain(queue)
+    
+    assert asyncio.run(run()) == (False, 1, ["a final"])
+
+
+def test_final_waits_for_room():
+    async def run():
+        queue = SessionQueue(maxsize=1)
+        await queue.put("a final")
+        put = asyncio.create_task(queue.put("b final"))
+        await asyncio.sleep(0)
+        assert not put.done()
+        assert await queue.get() == "a final"
+        assert await put
+        return await _drain(queue)
+    
+    assert asyncio.run(run()) == ["b final"]
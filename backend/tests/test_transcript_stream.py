@@ -0,0 +1,82 @@
+"""
+Tests for compliance matching across transcript segments
+"""
+
+import asyncio
+
+import pytest
+
+from services.compliance_engine import ComplianceEngine
+from services.transcript_stream import TranscriptStream
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = ComplianceEngine()
+    asyncio.run(engine.initialize())
+    return engine
+
+
+def _check(engine, stream, text, segment_id=None):
+    violations = asyncio.run(engine.check_stream(stream, "rep", text, segment_id=segment_id))
+    return [violation["rule_id"] for violation in violations]
+
+
+@pytest.mark.parametrize("first, second, rule_id", [
+    ("this drug can help", "with blood pressure", "off_label_001"),
+    ("It is 100%", "effective for most patients", "efficacy_001"),
+    ("Don't worry about", "side effects at all", "safety_001"),
+    ("there is a special deal", "if you switch today", "pricing_001"),
+])
+def test_split_phrase_fires_once(engine, first, second, rule_id):
+    joined = asyncio.run(engine.check_text(f"{first} {second}"))
+    assert rule_id in [violation["rule_id"] for violation in joined]
+    
+    stream = TranscriptStream()
+    fired = _check(engine, stream, first) + _check(engine, stream, second)
+    assert fired.count(rule_id) == 1
+
+
+def test_feed_boundary_includes_separator():
+    stream = TranscriptStream()
+    stream.feed("rep", "this drug can help")
+    window, boundary = stream.feed("rep", "with blood pressure")
+    assert window == "this drug can help with blood pressure"
+    assert window[boundary:] == " with blood pressure"
+
+
+def test_match_inside_tail_is_not_repeated(engine):
+    stream = TranscriptStream()
+    assert _check(engine, stream, "It never fails.") == ["efficacy_001"]
+    assert _check(engine, stream, "Anyway, about dosing.") == []
+
+
+def test_revised_segment_reports_rule_once(engine):
+    stream = TranscriptStream()
+    assert _check(engine, stream, "It is 100% effective", "s1") == ["efficacy_001"]
+    assert _check(engine, stream, "It is 100% effective for everyone", "s1") == []
+
+
+def test_violation_offsets_are_into_the_segment(engine):
+    stream = TranscriptStream()
+    _check(engine, stream, "We went over the clinical data from the last two quarters in detail.")
+    text = "  it never fails."
+    [violation] = asyncio.run(engine.check_stream(stream, "rep", text))
+    assert violation["matched_text"] == "never fails"
+    assert text[violation["match_start"]:violation["match_end"]] == "never fails"
+    assert not violation["cross_segment"]
+
+
+def test_split_match_is_clipped_to_the_segment(engine):
+    stream = TranscriptStream()
+    _check(engine, stream, "Don't worry about")
+    [violation] = asyncio.run(engine.check_stream(stream, "rep", "side effects at all"))
+    assert violation["cross_segment"]
+    assert (violation["match_start"], violation["matched_text"]) == (0, "side effects")
+
+
+def test_normalized_match_maps_to_original_text(engine):
+    text = "He said  never   fails"
+    [violation] = asyncio.run(engine.check_text(text))
+    assert violation["matched_text"] == "never   fails"
+    assert violation["match_start"] == text.index("never")